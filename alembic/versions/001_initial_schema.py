@@ -20,6 +20,15 @@ down_revision = None
 branch_labels = None
 depends_on = None
 
+# (name, table, columns) of the secondary indexes created by this revision
+INDEXES = [
+    ('ix_api_key_user_id', 'api_key', ['user_id']),
+    ('ix_content_user_id', 'content', ['user_id']),
+    ('ix_analytics_user_id', 'analytics', ['user_id']),
+    ('ix_analytics_timestamp', 'analytics', ['timestamp']),
+    ('ix_rag_vector_content_id', 'rag_vector', ['content_id']),
+]
+
 
 def upgrade() -> None:
     """Upgrade function: Create all initial tables."""
@@ -103,22 +112,20 @@ def upgrade() -> None:
         sa.PrimaryKeyConstraint('id')
     )
 
-    # Create indexes for better query performance
-    op.create_index('ix_api_key_user_id', 'api_key', ['user_id'])
-    op.create_index('ix_content_user_id', 'content', ['user_id'])
-    op.create_index('ix_analytics_user_id', 'analytics', ['user_id'])
-    op.create_index('ix_analytics_timestamp', 'analytics', ['timestamp'])
-    op.create_index('ix_rag_vector_content_id', 'rag_vector', ['content_id'])
+    # Create indexes for better query performance. CREATE INDEX CONCURRENTLY
+    # cannot run inside a transaction, so build them in autocommit mode;
+    # writers are not blocked while the indexes build.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True)
 
 
 def downgrade() -> None:
     """Downgrade function: Drop all tables."""
     # Drop indexes
-    op.drop_index('ix_rag_vector_content_id')
-    op.drop_index('ix_analytics_timestamp')
-    op.drop_index('ix_analytics_user_id')
-    op.drop_index('ix_content_user_id')
-    op.drop_index('ix_api_key_user_id')
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
     
     # Drop tables in reverse order of dependencies
     op.drop_table('rag_vector')
@@ -0,0 +1,343 @@
+"""Bring the initial schema in line with the ORM models.
+
+Revision ID: 001a
+Revises: 001
+Create Date: 2026-10-15
+
+001 created singular tables (user_account, api_key, rag_vector) with
+integer ids, while database/models.py, and every later revision, work
+on users/api_keys/rag_vectors with UUID ids, content status and tags,
+JSONB metadata_json and an analytics created_at column. This revision
+converts the 001 schema in place so the chain applies from an empty
+database:
+
+- tables and columns are renamed to the model names
+- integer ids become UUIDs; foreign keys are carried across by joining
+  on the old ids
+- the columns the models add are created, backfilling existing rows
+  where the column is NOT NULL or has a model-side default
+- the models' secondary indexes and constraints are created
+
+Indexes duplicating primary keys and the boolean is_active indexes are
+left out; 012 drops them from databases created with create_all.
+Downgrading renumbers the rows with integer ids in created_at order.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '001a'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+# (old name, new name)
+RENAMED_TABLES = [
+    ('user_account', 'users'),
+    ('api_key', 'api_keys'),
+    ('rag_vector', 'rag_vectors'),
+]
+
+# (table, old name, new name)
+RENAMED_COLUMNS = [
+    ('api_keys', 'last_used', 'last_used_at'),
+    ('content', 'metadata', 'metadata_json'),
+    ('analytics', 'timestamp', 'created_at'),
+    ('rag_vectors', 'vector_data', 'vector_text'),
+]
+
+# (table, old name, new name)
+RENAMED_INDEXES = [
+    ('analytics', 'ix_analytics_timestamp', 'ix_analytics_created_at'),
+]
+
+# Tables whose integer ids become UUIDs
+ID_TABLES = ['users', 'api_keys', 'content', 'analytics', 'rag_vectors']
+
+# (table, column, referenced table, nullable) for every foreign key to those ids
+FOREIGN_KEYS = [
+    ('api_keys', 'user_id', 'users', False),
+    ('content', 'user_id', 'users', False),
+    ('analytics', 'user_id', 'users', True),
+    ('rag_vectors', 'content_id', 'content', True),
+]
+
+# Unique constraints from 001 replaced by the models' unique indexes
+# (name, table, column)
+UNIQUE_CONSTRAINTS = [
+    ('user_account_username_key', 'users', 'username'),
+    ('user_account_email_key', 'users', 'email'),
+    ('api_key_key_hash_key', 'api_keys', 'key_hash'),
+]
+
+# Columns 001 declared NOT NULL that the models allow to be NULL, with
+# the value used to fill NULLs on downgrade
+# (table, column, fill)
+RELAXED_COLUMNS = [
+    ('users', 'is_active', 'true'),
+    ('users', 'created_at', 'CURRENT_TIMESTAMP'),
+    ('users', 'updated_at', 'CURRENT_TIMESTAMP'),
+    ('api_keys', 'is_active', 'true'),
+    ('api_keys', 'created_at', 'CURRENT_TIMESTAMP'),
+    ('content', 'created_at', 'CURRENT_TIMESTAMP'),
+    ('content', 'updated_at', 'CURRENT_TIMESTAMP'),
+    ('analytics', 'endpoint', "''"),
+    ('analytics', 'method', "''"),
+    ('analytics', 'status_code', '0'),
+    ('analytics', 'response_time_ms', '0'),
+    ('analytics', 'created_at', 'CURRENT_TIMESTAMP'),
+    ('system_metadata', 'updated_at', 'CURRENT_TIMESTAMP'),
+    ('rag_vectors', 'created_at', 'CURRENT_TIMESTAMP'),
+]
+
+# Naive DateTime columns from 001 that become timezone-aware; existing
+# values are taken to be UTC
+# (table, column)
+TIMESTAMP_COLUMNS = [
+    ('users', 'created_at'),
+    ('users', 'updated_at'),
+    ('api_keys', 'last_used_at'),
+    ('api_keys', 'created_at'),
+    ('content', 'created_at'),
+    ('content', 'updated_at'),
+    ('analytics', 'created_at'),
+    ('system_metadata', 'updated_at'),
+    ('rag_vectors', 'created_at'),
+]
+
+# (name, table, columns, unique)
+INDEXES = [
+    ('ix_users_username', 'users', ['username'], True),
+    ('ix_users_email', 'users', ['email'], True),
+    ('ix_users_created_at', 'users', ['created_at'], False),
+    ('ix_api_keys_key_hash', 'api_keys', ['key_hash'], True),
+    ('ix_api_keys_expires_at', 'api_keys', ['expires_at'], False),
+    ('ix_content_title', 'content', ['title'], False),
+    ('ix_content_style', 'content', ['style'], False),
+    ('ix_content_language', 'content', ['language'], False),
+    ('ix_content_status', 'content', ['status'], False),
+    ('ix_content_medium_url', 'content', ['medium_url'], True),
+    ('ix_content_created_at', 'content', ['created_at'], False),
+    ('ix_content_published_at', 'content', ['published_at'], False),
+    ('ix_content_user_created', 'content', ['user_id', 'created_at'], False),
+    ('ix_content_status_published', 'content', ['status', 'published_at'], False),
+    ('ix_analytics_content_id', 'analytics', ['content_id'], False),
+    ('ix_analytics_event_type', 'analytics', ['event_type'], False),
+    ('ix_analytics_event_category', 'analytics', ['event_category'], False),
+    ('ix_analytics_status_code', 'analytics', ['status_code'], False),
+    ('ix_analytics_request_id', 'analytics', ['request_id'], True),
+    ('ix_analytics_user_created', 'analytics', ['user_id', 'created_at'], False),
+    ('ix_analytics_event_created', 'analytics', ['event_type', 'created_at'], False),
+    ('ix_rag_vectors_created_at', 'rag_vectors', ['created_at'], False),
+    ('ix_rag_vectors_content_chunk', 'rag_vectors', ['content_id', 'chunk_index'], False),
+]
+
+
+def _type_changes():
+    """(table, column, old type, new type, upgrade USING, downgrade USING)."""
+    return [
+        ('users', 'username', sa.String(255), sa.String(50), None, None),
+        ('content', 'title', sa.String(255), sa.String(500), None, None),
+        ('content', 'metadata_json', sa.JSON(), postgresql.JSONB(),
+         'metadata_json::jsonb', 'metadata_json::json'),
+        ('analytics', 'method', sa.String(10), sa.String(20), None, None),
+        ('analytics', 'response_time_ms', sa.Float(), sa.Integer(),
+         'round(response_time_ms)::integer', None),
+        ('system_metadata', 'key', sa.String(255), sa.String(100), None, None),
+        ('rag_vectors', 'embedding_model', sa.String(255), sa.String(100), None, None),
+    ]
+
+
+def _added_columns():
+    """(table, column) for every column the models add.
+
+    A server default only backfills existing rows and is dropped once the
+    column exists; the models supply these values themselves.
+    """
+    return [
+        ('users', sa.Column('full_name', sa.String(255), nullable=True)),
+        ('users', sa.Column('is_admin', sa.Boolean(), server_default=sa.false())),
+        ('users', sa.Column('last_login_at', sa.DateTime(timezone=True), nullable=True)),
+        ('api_keys', sa.Column('name', sa.String(100), nullable=False, server_default='default')),
+        ('api_keys', sa.Column('rate_limit', sa.Integer(), server_default='1000')),
+        ('api_keys', sa.Column('expires_at', sa.DateTime(timezone=True), nullable=True)),
+        ('content', sa.Column('style', sa.String(50), nullable=False, server_default='satirical')),
+        ('content', sa.Column('language', sa.String(10), server_default='ru')),
+        ('content', sa.Column('status', sa.String(20), server_default='draft')),
+        ('content', sa.Column('prompt', sa.Text(), nullable=True)),
+        ('content', sa.Column('model_used', sa.String(100), nullable=False, server_default='unknown')),
+        ('content', sa.Column('tokens_used', sa.Integer(), nullable=True)),
+        ('content', sa.Column('generation_time_ms', sa.Integer(), nullable=True)),
+        ('content', sa.Column('views', sa.Integer(), server_default='0')),
+        ('content', sa.Column('likes', sa.Integer(), server_default='0')),
+        ('content', sa.Column('shares', sa.Integer(), server_default='0')),
+        ('content', sa.Column('comments_count', sa.Integer(), server_default='0')),
+        ('content', sa.Column('medium_url', sa.String(500), nullable=True)),
+        ('content', sa.Column('telegram_post_id', sa.String(100), nullable=True)),
+        ('content', sa.Column('twitter_url', sa.String(500), nullable=True)),
+        ('content', sa.Column('published_at', sa.DateTime(timezone=True), nullable=True)),
+        ('content', sa.Column('tags', sa.String(500), nullable=True)),
+        ('analytics', sa.Column('content_id', postgresql.UUID(as_uuid=True), nullable=True)),
+        ('analytics', sa.Column('event_type', sa.String(50), nullable=False, server_default='request')),
+        ('analytics', sa.Column('event_category', sa.String(50), nullable=False, server_default='api')),
+        ('analytics', sa.Column('error_message', sa.Text(), nullable=True)),
+        ('analytics', sa.Column('user_agent', sa.String(500), nullable=True)),
+        ('analytics', sa.Column('ip_address', sa.String(45), nullable=True)),
+        ('analytics', sa.Column('request_id', sa.String(100), nullable=True)),
+        ('analytics', sa.Column('metadata_json', postgresql.JSONB(), nullable=True)),
+        ('system_metadata', sa.Column('value_type', sa.String(20), server_default='string')),
+        ('system_metadata', sa.Column('description', sa.String(500), nullable=True)),
+        # Rows from 001 hold one embedding each; 0 marks an unknown dimension
+        ('rag_vectors', sa.Column('chunk_index', sa.Integer(), nullable=False, server_default='0')),
+        ('rag_vectors', sa.Column('vector_dimension', sa.Integer(), nullable=False, server_default='0')),
+        ('rag_vectors', sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True)),
+    ]
+
+
+def _swap_ids(id_type, fill_id) -> None:
+    """Replace every id and foreign key column with a column of id_type.
+
+    Args:
+        id_type: Type of the new id columns
+        fill_id: Callable returning the UPDATE that fills new_id for a table
+    """
+    for table in ID_TABLES:
+        op.add_column(table, sa.Column('new_id', id_type, nullable=True))
+        op.execute(fill_id(table))
+    for table, column, parent, _ in FOREIGN_KEYS:
+        op.add_column(table, sa.Column(f'new_{column}', id_type, nullable=True))
+        op.execute(
+            f'UPDATE {table} SET new_{column} = {parent}.new_id '
+            f'FROM {parent} WHERE {table}.{column} = {parent}.id'
+        )
+
+    # Dropping the old columns also drops their constraints, indexes and sequences
+    for table, column, _, _ in FOREIGN_KEYS:
+        op.drop_column(table, column)
+    for table in ID_TABLES:
+        op.drop_column(table, 'id')
+        op.alter_column(table, 'new_id', new_column_name='id', nullable=False)
+        op.create_primary_key(f'{table}_pkey', table, ['id'])
+    for table, column, parent, nullable in FOREIGN_KEYS:
+        op.alter_column(table, f'new_{column}', new_column_name=column, nullable=nullable)
+        op.create_foreign_key(f'{table}_{column}_fkey', table, parent, [column], ['id'])
+        op.create_index(f'ix_{table}_{column}', table, [column])
+
+
+def upgrade() -> None:
+    """Upgrade function: Convert the 001 schema to the models' schema."""
+    for old, new in RENAMED_TABLES:
+        op.rename_table(old, new)
+    for table, old, new in RENAMED_COLUMNS:
+        op.alter_column(table, old, new_column_name=new)
+    for _, old, new in RENAMED_INDEXES:
+        op.execute(f'ALTER INDEX {old} RENAME TO {new}')
+
+    _swap_ids(
+        postgresql.UUID(as_uuid=True),
+        lambda table: f'UPDATE {table} SET new_id = gen_random_uuid()',
+    )
+
+    # system_metadata is keyed by key alone
+    op.drop_column('system_metadata', 'id')
+    op.drop_constraint('system_metadata_key_key', 'system_metadata', type_='unique')
+    op.execute("UPDATE system_metadata SET value = '' WHERE value IS NULL")
+    op.alter_column('system_metadata', 'value', existing_type=sa.Text(), nullable=False)
+
+    for name, table, _ in UNIQUE_CONSTRAINTS:
+        op.drop_constraint(name, table, type_='unique')
+
+    for table, column, old_type, new_type, using, _ in _type_changes():
+        op.alter_column(
+            table, column, type_=new_type, existing_type=old_type,
+            postgresql_using=using,
+        )
+    op.create_primary_key('system_metadata_pkey', 'system_metadata', ['key'])
+    for table, column in TIMESTAMP_COLUMNS:
+        op.alter_column(
+            table, column,
+            type_=sa.DateTime(timezone=True), existing_type=sa.DateTime(),
+            postgresql_using=f"{column} AT TIME ZONE 'UTC'",
+        )
+    for table, column, _ in RELAXED_COLUMNS:
+        op.alter_column(table, column, nullable=True)
+
+    for table, column in _added_columns():
+        op.add_column(table, column)
+        if column.server_default is not None:
+            op.alter_column(table, column.name, server_default=None)
+
+    op.create_foreign_key(
+        'analytics_content_id_fkey', 'analytics', 'content', ['content_id'], ['id']
+    )
+    op.create_check_constraint(
+        'content_status_check', 'content', "status IN ('draft', 'published', 'archived')"
+    )
+    op.create_unique_constraint('content_telegram_post_id_key', 'content', ['telegram_post_id'])
+    op.create_unique_constraint('content_twitter_url_key', 'content', ['twitter_url'])
+
+    for name, table, columns, unique in INDEXES:
+        op.create_index(name, table, columns, unique=unique)
+
+
+def downgrade() -> None:
+    """Downgrade function: Restore the 001 schema."""
+    for name, table, _, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
+
+    op.drop_constraint('content_twitter_url_key', 'content', type_='unique')
+    op.drop_constraint('content_telegram_post_id_key', 'content', type_='unique')
+    op.drop_constraint('content_status_check', 'content', type_='check')
+
+    # Also drops analytics_content_id_fkey
+    for table, column in reversed(_added_columns()):
+        op.drop_column(table, column.name)
+
+    for table, column, fill in reversed(RELAXED_COLUMNS):
+        op.execute(f'UPDATE {table} SET {column} = {fill} WHERE {column} IS NULL')
+        op.alter_column(table, column, nullable=False)
+    for table, column in reversed(TIMESTAMP_COLUMNS):
+        op.alter_column(
+            table, column,
+            type_=sa.DateTime(), existing_type=sa.DateTime(timezone=True),
+            postgresql_using=f"{column} AT TIME ZONE 'UTC'",
+        )
+    op.drop_constraint('system_metadata_pkey', 'system_metadata', type_='primary')
+    for table, column, old_type, new_type, _, using in reversed(_type_changes()):
+        op.alter_column(
+            table, column, type_=old_type, existing_type=new_type,
+            postgresql_using=using,
+        )
+
+    for name, table, column in reversed(UNIQUE_CONSTRAINTS):
+        op.create_unique_constraint(name, table, [column])
+
+    op.alter_column('system_metadata', 'value', existing_type=sa.Text(), nullable=True)
+    op.create_unique_constraint('system_metadata_key_key', 'system_metadata', ['key'])
+    op.add_column('system_metadata', sa.Column('id', sa.Integer(), sa.Identity(), nullable=False))
+    op.create_primary_key('system_metadata_pkey', 'system_metadata', ['id'])
+
+    _swap_ids(
+        sa.Integer(),
+        lambda table: (
+            f'UPDATE {table} SET new_id = numbered.n FROM ('
+            f'SELECT id, row_number() OVER (ORDER BY created_at, id) AS n FROM {table}'
+            f') AS numbered WHERE {table}.id = numbered.id'
+        ),
+    )
+    for table in ID_TABLES:
+        op.execute(f'ALTER TABLE {table} ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY')
+        op.execute(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+            f"(SELECT coalesce(max(id), 0) + 1 FROM {table}), false)"
+        )
+
+    for _, old, new in reversed(RENAMED_INDEXES):
+        op.execute(f'ALTER INDEX {new} RENAME TO {old}')
+    for table, old, new in reversed(RENAMED_COLUMNS):
+        op.alter_column(table, new, new_column_name=old)
+    for old, new in reversed(RENAMED_TABLES):
+        op.rename_table(new, old)
+    # 001 drops its foreign key indexes by their original names
+    op.execute('ALTER INDEX ix_api_keys_user_id RENAME TO ix_api_key_user_id')
+    op.execute('ALTER INDEX ix_rag_vectors_content_id RENAME TO ix_rag_vector_content_id')
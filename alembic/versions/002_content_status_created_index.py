@@ -0,0 +1,43 @@
+"""Add index for keyset pagination of content listings.
+
+Revision ID: 002
+Revises: 001a
+Create Date: 2026-10-15
+
+Content listings page by ``(created_at, id) < (:cursor, :cursor_id)``
+ordered newest first, optionally filtered by status. The id breaks ties
+between rows created in the same instant. A composite
+(status, created_at DESC, id DESC) index serves both as an index range
+scan regardless of page depth.
+
+The index is built CONCURRENTLY outside the migration transaction so
+writers are not blocked while it builds.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '002'
+down_revision = '001a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Upgrade function: Create the status/created_at/id index."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_content_status_created_at',
+            'content',
+            ['status', sa.text('created_at DESC'), sa.text('id DESC')],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade function: Drop the status/created_at/id index."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_content_status_created_at',
+            table_name='content',
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,69 @@
+"""Index analytics for time-range and per-endpoint queries.
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-15
+
+Analytics rows are append-only, so their created_at values are
+physically ordered on disk. A BRIN index summarises each block range
+in a few bytes and serves time-range scans at a fraction of the
+btree's size, so the btree on ``created_at`` is replaced. Per-endpoint
+rollups get a composite (endpoint, created_at DESC) btree. The names
+match the Analytics model, so autogenerate and drop_hot_indexes see
+the same indexes.
+
+Indexes are built and dropped CONCURRENTLY outside the migration
+transaction so writers are not blocked.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Upgrade function: Add BRIN and endpoint indexes, drop created_at btree."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_analytics_created_brin',
+            'analytics',
+            ['created_at'],
+            postgresql_using='brin',
+            postgresql_with={'pages_per_range': 32},
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_analytics_endpoint_created',
+            'analytics',
+            ['endpoint', sa.text('created_at DESC')],
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_analytics_created_at',
+            table_name='analytics',
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade function: Restore the created_at btree."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_analytics_created_at',
+            'analytics',
+            ['created_at'],
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_analytics_endpoint_created',
+            table_name='analytics',
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_analytics_created_brin',
+            table_name='analytics',
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,31 @@
+"""Let the database stamp content.updated_at.
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-15
+
+The Content model now fills updated_at with the database clock
+(server default on insert, now() in the UPDATE on change) instead of
+a timestamp computed in the application.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Upgrade function: Add a CURRENT_TIMESTAMP default to content.updated_at."""
+    op.alter_column(
+        'content',
+        'updated_at',
+        server_default=sa.text('CURRENT_TIMESTAMP'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade function: Remove the content.updated_at default."""
+    op.alter_column('content', 'updated_at', server_default=None)
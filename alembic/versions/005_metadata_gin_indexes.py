@@ -0,0 +1,50 @@
+"""Add GIN indexes for JSONB metadata containment queries.
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-15
+
+Filters on metadata_json (``metadata_json @> '{...}'``) were sequential
+scans. jsonb_path_ops GIN indexes only support containment, but are
+smaller and faster to probe than the default jsonb_ops opclass, which
+suits this read-mostly data.
+
+Indexes are built CONCURRENTLY outside the migration transaction so
+writers are not blocked.
+"""
+from alembic import op
+
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_content_metadata_gin', 'content'),
+    ('ix_analytics_metadata_gin', 'analytics'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade function: Create the metadata_json GIN indexes."""
+    with op.get_context().autocommit_block():
+        for name, table in INDEXES:
+            op.create_index(
+                name,
+                table,
+                ['metadata_json'],
+                postgresql_using='gin',
+                postgresql_ops={'metadata_json': 'jsonb_path_ops'},
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade function: Drop the metadata_json GIN indexes."""
+    with op.get_context().autocommit_block():
+        for name, table in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+            )
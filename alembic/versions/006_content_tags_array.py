@@ -0,0 +1,59 @@
+"""Store content tags as a text array with a GIN index.
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-15
+
+Tags were a comma-separated string, so tag filters needed
+``LIKE '%tag%'`` scans that no index can serve. The column becomes
+``text[]`` (existing values are split on commas, trimming whitespace)
+and gets a GIN index so overlap (``&&``) and containment (``@>``)
+filters use the index.
+
+The type change runs in the migration transaction; the index is then
+built CONCURRENTLY outside it.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Upgrade function: Convert content.tags to text[] and index it."""
+    op.alter_column(
+        'content',
+        'tags',
+        type_=postgresql.ARRAY(sa.Text()),
+        existing_type=sa.String(length=500),
+        postgresql_using=r"regexp_split_to_array(NULLIF(btrim(tags), ''), '\s*,\s*')",
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_content_tags_gin',
+            'content',
+            ['tags'],
+            postgresql_using='gin',
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade function: Drop the GIN index and restore comma-separated tags."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_content_tags_gin',
+            table_name='content',
+            postgresql_concurrently=True,
+        )
+    op.alter_column(
+        'content',
+        'tags',
+        type_=sa.String(length=500),
+        existing_type=postgresql.ARRAY(sa.Text()),
+        postgresql_using="array_to_string(tags, ',')",
+    )
@@ -0,0 +1,50 @@
+"""Store RAG embeddings in a pgvector column with an HNSW index.
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-15
+
+rag_vectors kept only the source text, so similarity search had to load
+every embedding into Python. The new ``embedding vector(384)`` column
+with an HNSW (vector_cosine_ops) index lets the database answer
+``ORDER BY embedding <=> :query LIMIT k`` directly.
+
+Requires the pgvector extension. The column is nullable so existing
+rows stay valid until they are re-embedded; the index is built
+CONCURRENTLY outside the migration transaction.
+"""
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Upgrade function: Add the embedding column and its HNSW index."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS vector')
+    op.add_column('rag_vectors', sa.Column('embedding', Vector(384), nullable=True))
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_rag_vectors_embedding_hnsw',
+            'rag_vectors',
+            ['embedding'],
+            postgresql_using='hnsw',
+            postgresql_ops={'embedding': 'vector_cosine_ops'},
+            postgresql_with={'m': 16, 'ef_construction': 64},
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade function: Drop the HNSW index and embedding column."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_rag_vectors_embedding_hnsw',
+            table_name='rag_vectors',
+            postgresql_concurrently=True,
+        )
+    op.drop_column('rag_vectors', 'embedding')
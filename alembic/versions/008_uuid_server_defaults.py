@@ -0,0 +1,33 @@
+"""Generate UUID primary keys in the database.
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-15
+
+Primary keys were generated in Python with uuid.uuid4 for every row.
+With a gen_random_uuid() server default the ids come back through
+INSERT ... RETURNING, so bulk inserts can be sent as multi-row
+statements. gen_random_uuid() is built into PostgreSQL 13+ (older
+servers need the pgcrypto extension).
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+TABLES = ['users', 'api_keys', 'content', 'analytics', 'rag_vectors']
+
+
+def upgrade() -> None:
+    """Upgrade function: Default UUID primary keys to gen_random_uuid()."""
+    for table in TABLES:
+        op.alter_column(table, 'id', server_default=sa.text('gen_random_uuid()'))
+
+
+def downgrade() -> None:
+    """Downgrade function: Remove the UUID primary key defaults."""
+    for table in reversed(TABLES):
+        op.alter_column(table, 'id', server_default=None)
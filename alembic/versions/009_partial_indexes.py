@@ -0,0 +1,62 @@
+"""Replace broad status indexes with partial indexes on the hot subsets.
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-15
+
+Published-content listings filter on status = 'published' and range over
+published_at, and API key lookups only consider active keys. Partial
+indexes hold just those rows, so they are a fraction of the size of the
+(status, published_at) composite they replace and stay cached.
+
+Indexes are built CONCURRENTLY outside the migration transaction so
+writers are not blocked.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+PARTIAL_INDEXES = [
+    ('ix_content_published_time', 'content', 'published_at', "status = 'published'"),
+    ('ix_api_keys_active_expires', 'api_keys', 'expires_at', 'is_active = true'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade function: Create partial indexes and drop the composite."""
+    with op.get_context().autocommit_block():
+        for name, table, column, where in PARTIAL_INDEXES:
+            op.create_index(
+                name,
+                table,
+                [column],
+                postgresql_where=sa.text(where),
+                postgresql_concurrently=True,
+            )
+        op.drop_index(
+            'ix_content_status_published',
+            table_name='content',
+            if_exists=True,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade function: Restore the composite and drop partial indexes."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_content_status_published',
+            'content',
+            ['status', 'published_at'],
+            postgresql_concurrently=True,
+        )
+        for name, table, _, _ in reversed(PARTIAL_INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+            )
@@ -0,0 +1,40 @@
+"""Let the database stamp created_at/updated_at on every table.
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-15
+
+Like content.updated_at in 004, the remaining timestamp columns now get
+their values from the database clock (server default on insert, now()
+in the UPDATE on change) instead of a per-row Python call.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+COLUMNS = [
+    ('users', 'created_at'),
+    ('users', 'updated_at'),
+    ('api_keys', 'created_at'),
+    ('content', 'created_at'),
+    ('analytics', 'created_at'),
+    ('system_metadata', 'updated_at'),
+    ('rag_vectors', 'created_at'),
+    ('rag_vectors', 'updated_at'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade function: Add CURRENT_TIMESTAMP defaults to timestamp columns."""
+    for table, column in COLUMNS:
+        op.alter_column(table, column, server_default=sa.text('CURRENT_TIMESTAMP'))
+
+
+def downgrade() -> None:
+    """Downgrade function: Remove the timestamp defaults."""
+    for table, column in reversed(COLUMNS):
+        op.alter_column(table, column, server_default=None)
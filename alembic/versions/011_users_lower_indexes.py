@@ -0,0 +1,50 @@
+"""Add unique lower() indexes for case-insensitive user lookups.
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-15
+
+Login lookups compare lower(email) / lower(username), which cannot use
+the plain b-tree indexes on those columns. Expression indexes on
+lower() serve those lookups and also stop case-only duplicate accounts.
+The build fails if such duplicates already exist; merge them first.
+
+Indexes are built CONCURRENTLY outside the migration transaction so
+writers are not blocked.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '011'
+down_revision = '010'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_users_email_lower', 'email'),
+    ('ix_users_username_lower', 'username'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade function: Create the lower(email)/lower(username) indexes."""
+    with op.get_context().autocommit_block():
+        for name, column in INDEXES:
+            op.create_index(
+                name,
+                'users',
+                [sa.text(f'lower({column})')],
+                unique=True,
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade function: Drop the lower() indexes."""
+    with op.get_context().autocommit_block():
+        for name, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name='users',
+                postgresql_concurrently=True,
+            )
@@ -0,0 +1,57 @@
+"""Drop indexes duplicating primary keys and boolean is_active indexes.
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-15
+
+Primary keys already have their own unique index, so the extra
+ix_<table>_id b-trees only added write and WAL cost. The is_active
+boolean indexes are too unselective for the planner to use; active API
+keys are covered by the partial ix_api_keys_active_expires (009).
+
+These indexes came from index=True on the models, so they exist only on
+databases created with create_all; they are dropped with IF EXISTS.
+"""
+from alembic import op
+
+revision = '012'
+down_revision = '011'
+branch_labels = None
+depends_on = None
+
+# (name, table, columns)
+INDEXES = [
+    ('ix_users_id', 'users', ['id']),
+    ('ix_users_is_active', 'users', ['is_active']),
+    ('ix_api_keys_id', 'api_keys', ['id']),
+    ('ix_api_keys_is_active', 'api_keys', ['is_active']),
+    ('ix_content_id', 'content', ['id']),
+    ('ix_analytics_id', 'analytics', ['id']),
+    ('ix_system_metadata_key', 'system_metadata', ['key']),
+    ('ix_rag_vectors_id', 'rag_vectors', ['id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade function: Drop the redundant indexes."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in INDEXES:
+            op.drop_index(
+                name,
+                table_name=table,
+                if_exists=True,
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade function: Recreate the dropped indexes."""
+    with op.get_context().autocommit_block():
+        for name, table, columns in reversed(INDEXES):
+            op.create_index(
+                name,
+                table,
+                columns,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+            )
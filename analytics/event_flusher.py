@@ -0,0 +1,211 @@
+"""Analytics Event Flusher
+
+Drains the EventTracker ring buffer in the background and persists the
+buffered events to the analytics table with one executemany INSERT per
+batch, so request handlers never write analytics rows inline. A flush
+runs every FLUSH_INTERVAL seconds, or sooner once FLUSH_THRESHOLD events
+are waiting.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional
+from uuid import UUID
+
+from sqlalchemy import insert, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from analytics.event_tracking import EventTracker, get_event_tracker
+from database.db_config import AsyncSessionManager, get_async_session_manager
+from database.models import Analytics
+
+logger = logging.getLogger(__name__)
+
+# Seconds between flushes
+FLUSH_INTERVAL = 1.0
+
+# Buffered events that trigger a flush before the interval elapses
+FLUSH_THRESHOLD = 100
+
+# How often the flush loop checks the buffer size (seconds)
+POLL_INTERVAL = 0.1
+
+# Maximum rows per INSERT statement
+MAX_BATCH_ROWS = 5000
+
+# Per-dialect batch sizes; PostgreSQL gains little past ~1000 rows while
+# MySQL keeps improving with larger multi-row INSERTs
+BATCH_ROWS_BY_DIALECT = {
+    'postgresql': 1000,
+    'mysql': 10000,
+}
+
+# Event data keys that map directly onto Analytics columns
+_COLUMN_KEYS = (
+    'event_category', 'endpoint', 'method', 'status_code', 'response_time_ms',
+    'error_message', 'user_agent', 'ip_address', 'request_id',
+)
+_UUID_KEYS = ('user_id', 'content_id')
+
+
+def event_to_row(event: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a tracked event into an analytics row.
+
+    Args:
+        event: Event produced by EventTracker.track_event
+
+    Returns:
+        Column values for an Analytics insert
+    """
+    data = dict(event.get('data') or {})
+    row: Dict[str, Any] = {
+        'event_type': event['event_type'],
+        'event_category': 'api',
+        'created_at': datetime.fromtimestamp(
+            event['timestamp_ns'] / 1e9, tz=timezone.utc
+        ),
+    }
+    for key in _COLUMN_KEYS:
+        if key in data:
+            row[key] = data.pop(key)
+    for key in _UUID_KEYS:
+        value = data.pop(key, None)
+        if value is not None:
+            row[key] = value if isinstance(value, UUID) else UUID(str(value))
+    if row.get('response_time_ms') is not None:
+        row['response_time_ms'] = int(row['response_time_ms'])
+    row['metadata_json'] = data or None
+    return row
+
+
+class AnalyticsFlusher:
+    """Periodically persists buffered analytics events in bulk."""
+
+    def __init__(self, tracker: Optional[EventTracker] = None,
+                 session_manager: Optional[AsyncSessionManager] = None,
+                 interval: float = FLUSH_INTERVAL,
+                 max_batch: Optional[int] = None,
+                 threshold: int = FLUSH_THRESHOLD):
+        """Initialize the flusher.
+
+        Args:
+            tracker: Event tracker to drain (defaults to the global tracker)
+            session_manager: Session manager (defaults to the global one)
+            interval: Seconds between flushes
+            max_batch: Maximum rows per INSERT statement (defaults to
+                the dialect's entry in BATCH_ROWS_BY_DIALECT)
+            threshold: Buffered events that trigger an early flush
+        """
+        self.tracker = tracker or get_event_tracker()
+        self._session_manager = session_manager
+        self.interval = interval
+        self.max_batch = max_batch
+        self.threshold = threshold
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def session_manager(self) -> AsyncSessionManager:
+        if self._session_manager is None:
+            self._session_manager = get_async_session_manager()
+        return self._session_manager
+
+    def _insert_statement(self, dialect_name: str):
+        """Build the INSERT, ignoring duplicate request IDs on PostgreSQL."""
+        if dialect_name == 'postgresql':
+            return pg_insert(Analytics).on_conflict_do_nothing()
+        return insert(Analytics)
+
+    def batch_size(self, dialect_name: str) -> int:
+        """Rows per INSERT statement for the given dialect."""
+        if self.max_batch:
+            return self.max_batch
+        return BATCH_ROWS_BY_DIALECT.get(dialect_name, MAX_BATCH_ROWS)
+
+    async def flush(self) -> int:
+        """Drain the tracker and insert its events.
+
+        If the insert fails the events are put back in the tracker's
+        buffer, so the next flush retries them.
+
+        Returns:
+            Number of rows written
+        """
+        events = self.tracker.drain()
+        if not events:
+            return 0
+
+        rows: List[Dict[str, Any]] = []
+        valid: List[Dict[str, Any]] = []
+        for event in events:
+            try:
+                rows.append(event_to_row(event))
+                valid.append(event)
+            except (KeyError, ValueError) as e:
+                logger.warning(f"Skipping malformed analytics event: {e}")
+
+        written = 0
+        try:
+            dialect_name = self.session_manager.engine.dialect.name
+            async with self.session_manager.session_scope() as session:
+                if dialect_name == 'postgresql':
+                    # Analytics can tolerate losing the last few hundred ms on a
+                    # crash; skip waiting for the WAL fsync on this transaction
+                    await session.execute(text("SET LOCAL synchronous_commit = off"))
+                stmt = self._insert_statement(dialect_name)
+                batch_size = self.batch_size(dialect_name)
+                for start in range(0, len(rows), batch_size):
+                    batch = rows[start:start + batch_size]
+                    await session.execute(stmt, batch)
+                    written += len(batch)
+        except Exception as e:
+            # The transaction rolled back as a whole; requeue every event
+            self.tracker.requeue(valid)
+            logger.error(f"Error flushing analytics events: {str(e)}")
+            return 0
+
+        logger.debug(f"Flushed {written} analytics events")
+        return written
+
+    async def run(self) -> None:
+        """Flush loop; runs until cancelled."""
+        loop = asyncio.get_running_loop()
+        last_flush = loop.time()
+        while True:
+            await asyncio.sleep(min(POLL_INTERVAL, self.interval))
+            if (len(self.tracker.event_buffer) < self.threshold
+                    and loop.time() - last_flush < self.interval):
+                continue
+            last_flush = loop.time()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Error flushing analytics events: {str(e)}")
+
+    def start(self) -> None:
+        """Start the background flush loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+            logger.info("Analytics flusher started")
+
+    async def stop(self) -> None:
+        """Stop the flush loop and persist remaining events."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Error flushing analytics events on shutdown: {str(e)}")
+
+
+# Global flusher instance
+_analytics_flusher: Optional[AnalyticsFlusher] = None
+
+
+def get_analytics_flusher() -> AnalyticsFlusher:
+    """Get or create global analytics flusher"""
+    global _analytics_flusher
+    if _analytics_flusher is None:
+        _analytics_flusher = AnalyticsFlusher()
+    return _analytics_flusher
@@ -0,0 +1,80 @@
+"""Analytics Event Queries
+
+Read helpers for the analytics table. Raw events are streamed through a
+server-side cursor in fixed-size windows instead of being materialized
+as one list, and aggregates are computed by the database.
+"""
+
+import logging
+from datetime import datetime
+from typing import AsyncIterator, Dict, Optional
+
+from sqlalchemy import func, select
+
+from database.db_config import AsyncSessionManager, get_async_session_manager
+from database.models import Analytics
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched from the server-side cursor per round trip
+STREAM_BATCH_ROWS = 1000
+
+
+def _time_range(stmt, since: datetime, until: Optional[datetime]):
+    """Restrict a statement to events created in [since, until)."""
+    stmt = stmt.where(Analytics.created_at >= since)
+    if until is not None:
+        stmt = stmt.where(Analytics.created_at < until)
+    return stmt
+
+
+async def stream_events(since: datetime, until: Optional[datetime] = None,
+                        event_type: Optional[str] = None,
+                        session_manager: Optional[AsyncSessionManager] = None,
+                        batch_size: int = STREAM_BATCH_ROWS
+                        ) -> AsyncIterator[Analytics]:
+    """Yield analytics events in created_at order without buffering them all.
+
+    Args:
+        since: Inclusive lower bound on created_at
+        until: Exclusive upper bound on created_at (open-ended if None)
+        event_type: Only yield events of this type
+        session_manager: Session manager (defaults to the global one)
+        batch_size: Rows fetched per round trip
+
+    Yields:
+        Analytics rows; memory use stays O(batch_size)
+    """
+    session_manager = session_manager or get_async_session_manager()
+    stmt = _time_range(select(Analytics), since, until)
+    if event_type is not None:
+        stmt = stmt.where(Analytics.event_type == event_type)
+    stmt = stmt.order_by(Analytics.created_at).execution_options(yield_per=batch_size)
+
+    async with session_manager.get_session() as session:
+        result = await session.stream_scalars(stmt)
+        async for event in result:
+            yield event
+
+
+async def count_events_by_type(since: datetime, until: Optional[datetime] = None,
+                               session_manager: Optional[AsyncSessionManager] = None
+                               ) -> Dict[str, int]:
+    """Count events per event_type in a time range.
+
+    Args:
+        since: Inclusive lower bound on created_at
+        until: Exclusive upper bound on created_at (open-ended if None)
+        session_manager: Session manager (defaults to the global one)
+
+    Returns:
+        Mapping of event_type to number of events
+    """
+    session_manager = session_manager or get_async_session_manager()
+    stmt = _time_range(
+        select(Analytics.event_type, func.count()), since, until
+    ).group_by(Analytics.event_type)
+
+    async with session_manager.get_session() as session:
+        result = await session.execute(stmt)
+        return {event_type: count for event_type, count in result}
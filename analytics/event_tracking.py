@@ -5,24 +5,39 @@ It tracks user interactions, content generation events, and system performance m
 """
 
 import json
+import time
+import random
 import logging
-from datetime import datetime
-from typing import Dict, Any, Optional
+from collections import deque
+from typing import Dict, Any, List, Optional
 
 logger = logging.getLogger(__name__)
 
+# Default ring buffer capacity (events)
+DEFAULT_BUFFER_SIZE = 65536
+
 
 class EventTracker:
-    """Tracks application events for analytics and monitoring."""
+    """Tracks application events for analytics and monitoring.
+
+    Events are kept in a fixed-capacity ring buffer. When the buffer is
+    full the oldest event is dropped (and counted) instead of blocking or
+    growing without bound.
+    """
 
-    def __init__(self, metrics_service=None):
+    def __init__(self, metrics_service=None, buffer_size: int = DEFAULT_BUFFER_SIZE,
+                 sample_rate: float = 1.0):
         """Initialize the event tracker.
         
         Args:
             metrics_service: Optional service for sending metrics
+            buffer_size: Maximum number of buffered events
+            sample_rate: Fraction of events to keep (0.0-1.0)
         """
         self.metrics_service = metrics_service
-        self.event_buffer = []
+        self.sample_rate = sample_rate
+        self.event_buffer: deque = deque(maxlen=buffer_size)
+        self.dropped = 0
 
     def track_event(self, event_type: str, data: Dict[str, Any]) -> None:
         """Track an event.
@@ -31,16 +46,19 @@ class EventTracker:
             event_type: Type of event to track
             data: Event data dictionary
         """
-        event = {
-            'timestamp': datetime.utcnow().isoformat(),
-            'event_type': event_type,
-            'data': data
-        }
-        self.event_buffer.append(event)
-        logger.info(f"Event tracked: {event_type}")
-        
         if self.metrics_service:
             self.metrics_service.record_event(event_type)
+        elif self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return
+        
+        if len(self.event_buffer) == self.event_buffer.maxlen:
+            self.dropped += 1
+        self.event_buffer.append({
+            'timestamp_ns': time.time_ns(),
+            'event_type': event_type,
+            'data': data
+        })
+        logger.debug("Event tracked: %s", event_type)
 
     def track_content_generation(self, prompt: str, generated_text: str, 
                                 latency_ms: float) -> None:
@@ -76,8 +94,50 @@ class EventTracker:
 
     def get_events(self) -> list:
         """Get all tracked events."""
-        return self.event_buffer.copy()
+        return list(self.event_buffer)
+
+    def drain(self) -> List[Dict[str, Any]]:
+        """Return all buffered events and reset the buffer.
+        
+        Returns:
+            Events in the order they were tracked
+        """
+        events = []
+        popleft = self.event_buffer.popleft
+        try:
+            while True:
+                events.append(popleft())
+        except IndexError:
+            pass
+        return events
+
+    def requeue(self, events: List[Dict[str, Any]]) -> None:
+        """Put drained events back at the front of the buffer.
+        
+        Events tracked since the drain are kept. If the buffer cannot hold
+        all of them, the oldest requeued events are dropped (and counted).
+        
+        Args:
+            events: Events returned by drain, oldest first
+        """
+        room = self.event_buffer.maxlen - len(self.event_buffer)
+        if len(events) > room:
+            self.dropped += len(events) - room
+            events = events[len(events) - room:] if room > 0 else []
+        self.event_buffer.extendleft(reversed(events))
 
     def clear_events(self) -> None:
         """Clear event buffer."""
         self.event_buffer.clear()
+
+
+# Global event tracker instance
+_event_tracker: Optional[EventTracker] = None
+
+
+def get_event_tracker() -> EventTracker:
+    """Get or create global event tracker"""
+    global _event_tracker
+    if _event_tracker is None:
+        _event_tracker = EventTracker()
+    return _event_tracker
@@ -2,13 +2,25 @@ import os
 import json
 import asyncio
 import logging
+import uuid
+from datetime import datetime, timezone
 from typing import Optional, List
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+from fastapi import FastAPI, HTTPException, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel, ConfigDict
 import httpx
 import yaml
 
+from caching.cache_manager import LRUCache
+from rate_limiting.rate_limiter import PerClientRateLimiter
+
+# The api/ directory holds the router modules but this module shadows it;
+# give the module a package path so api.routes.* resolves under it
+__path__ = [os.path.join(os.path.dirname(os.path.abspath(__file__)), 'api')]
+
+from api.routes import content as content_routes
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -19,25 +31,106 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title='Faberlic Satire RAG API', version='2.0')
+app = FastAPI(
+    title='Faberlic Satire RAG API',
+    version='2.0',
+    default_response_class=ORJSONResponse
+)
+app.include_router(content_routes.router)
 
 # Load configuration
 with open('config.yml', 'r') as f:
     config = yaml.safe_load(f)
 
+# Configuration is immutable at runtime, so lookups and the /config and
+# /platforms payloads are built once here
+PLATFORM_NAMES = frozenset(config['platforms'])
+
+CONFIG_RESPONSE = {'platforms': list(config['platforms'])}
+
+PLATFORMS_RESPONSE = {
+    'platforms': [
+        {
+            'name': name,
+            'enabled': platform['enabled'],
+            'schedule': platform['posting_schedule'],
+            'content_type': platform['content_type']
+        }
+        for name, platform in config['platforms'].items()
+    ],
+    'llm_provider': 'Perplexity Pro'
+}
+
 # Perplexity Pro API Configuration
 PERPLEXITY_API_URL = "https://api.perplexity.ai/chat/completions"
 PERPLEXITY_API_KEY = os.getenv('PERPLEXITY_API_KEY')
 
+# Maximum number of concurrent Perplexity calls per /batch request
+BATCH_CONCURRENCY = int(os.getenv('BATCH_CONCURRENCY', '8'))
+
+# Timeout for Perplexity API calls (seconds)
+REQUEST_TIMEOUT = float(os.getenv('REQUEST_TIMEOUT', '30'))
+
+# Background generation workers, sized to the provider rate limit
+GENERATION_WORKERS = int(os.getenv('GENERATION_WORKERS', '4'))
+
+# How long finished async generation results are kept (seconds)
+JOB_RESULT_TTL = int(os.getenv('JOB_RESULT_TTL', '3600'))
+
+# Queued /generate/async jobs beyond this are refused with 503
+GENERATION_QUEUE_SIZE = int(os.getenv('GENERATION_QUEUE_SIZE', '100'))
+
+# Retry-After (seconds) sent with the 503 when the generation queue is full
+QUEUE_FULL_RETRY_AFTER = int(os.getenv('QUEUE_FULL_RETRY_AFTER', '30'))
+
+# Requests per minute the generation workers send to each Perplexity model
+MODEL_RATE_LIMIT = int(os.getenv('MODEL_RATE_LIMIT', '50'))
+
 if not PERPLEXITY_API_KEY:
     logger.warning(
         "PERPLEXITY_API_KEY not found in environment variables. "
         "Please set it in .env file or as environment variable."
     )
 
+# Prompt templates with Russian-specific satirical style, filled per request
+CONTENT_TONE = config['content_generation']['tone']
+TARGET_AUDIENCE = config['content_generation']['target_audience']
+
+SYSTEM_PROMPT_TEMPLATE = """
+    Ты профессиональный сатирический писатель, специализирующийся на русском юморе в стиле Задорнова и Жванецкого.
+    
+    Твоя задача: создавать остроумные, провокационные, но доступные сатирические тексты о современных lifestyle трендах.
+    
+    Стиль: {tone}
+    Целевая аудитория: {target_audience}
+    Язык: {language}
+    Платформа: {platform}
+    
+    Требования:
+    - Текст должен быть остроумным и провокационным, но не оскорбительным
+    - Используй современные примеры и культурные ссылки
+    - Сохраняй баланс между критикой и юмором
+    - Текст должен быть подходящим для публикации на {platform}
+    """
+
+USER_MESSAGE_TEMPLATE = """
+    Напиши сатирическую статью о: {topic}
+    
+    Длина: 800-1200 слов
+    Стиль: {style}
+    
+    Убедись, что текст:
+    1. Содержит острый социальный комментарий
+    2. Использует иронию и парадокс
+    3. Релевантен для целевой аудитории на {platform}
+    4. Может привлечь интерес к продуктам Faberlic (косметика и ухоз за собой)
+    """
+
 
 class ContentRequest(BaseModel):
     """Request model for content generation"""
+    model_config = ConfigDict(extra='ignore', frozen=True)
+    
     platform: str
     topic: str
     style: str = 'satirical_witty'
@@ -47,6 +140,8 @@ class ContentRequest(BaseModel):
 
 class ContentResponse(BaseModel):
     """Response model for generated content"""
+    model_config = ConfigDict(frozen=True)
+    
     platform: str
     content: str
     hashtags: List[str]
@@ -54,6 +149,195 @@ class ContentResponse(BaseModel):
     model: str = 'pplx-70b-online'
 
 
+def _validate_request(request: ContentRequest) -> dict:
+    """Check the platform and API key, returning the platform config"""
+    if request.platform not in PLATFORM_NAMES:
+        raise HTTPException(
+            status_code=400,
+            detail=f'Unknown platform: {request.platform}'
+        )
+    
+    platform_config = config['platforms'][request.platform]
+    if not platform_config['enabled']:
+        raise HTTPException(
+            status_code=400,
+            detail=f'Platform {request.platform} is disabled'
+        )
+    
+    # Check API key availability
+    if not PERPLEXITY_API_KEY:
+        raise HTTPException(
+            status_code=500,
+            detail='Perplexity API key not configured. Please set PERPLEXITY_API_KEY environment variable.'
+        )
+    
+    return platform_config
+
+
+def _perplexity_headers() -> dict:
+    """Request headers for the Perplexity Pro API"""
+    return {
+        "Authorization": f"Bearer {PERPLEXITY_API_KEY}",
+        "Content-Type": "application/json"
+    }
+
+
+def _model_name(request: ContentRequest) -> str:
+    """Perplexity model that serves the request"""
+    return "pplx-70b-online" if request.use_search else "pplx-70b-chat"
+
+
+def _build_payload(request: ContentRequest, stream: bool = False) -> dict:
+    """Build the Perplexity chat completion payload for a request"""
+    system_prompt = SYSTEM_PROMPT_TEMPLATE.format(
+        tone=CONTENT_TONE,
+        target_audience=TARGET_AUDIENCE,
+        language=request.language,
+        platform=request.platform
+    )
+    user_message = USER_MESSAGE_TEMPLATE.format(
+        topic=request.topic,
+        style=request.style,
+        platform=request.platform
+    )
+    
+    payload = {
+        "model": _model_name(request),
+        "messages": [
+            {
+                "role": "system",
+                "content": system_prompt
+            },
+            {
+                "role": "user",
+                "content": user_message
+            }
+        ],
+        "temperature": 0.8,  # Higher temperature for more creative satire
+        "top_p": 0.9,
+        "max_tokens": 2000,
+        "presence_penalty": 0.6  # Encourage diversity in word usage
+    }
+    if stream:
+        payload["stream"] = True
+    return payload
+
+
+def _parse_sse_line(line: str) -> Optional[str]:
+    """Extract the content delta from one Perplexity SSE line
+    
+    Returns None for blank lines, keep-alives, the [DONE] marker and
+    chunks that carry no text.
+    """
+    if not line.startswith('data:'):
+        return None
+    data = line[5:].strip()
+    if not data or data == '[DONE]':
+        return None
+    try:
+        chunk = json.loads(data)
+    except json.JSONDecodeError:
+        logger.warning(f"Skipping malformed stream chunk: {data[:100]}")
+        return None
+    choices = chunk.get('choices') or [{}]
+    return choices[0].get('delta', {}).get('content') or None
+
+
+@app.on_event('startup')
+async def create_http_client():
+    """Create the shared HTTP/2 client used for all Perplexity calls"""
+    app.state.http = httpx.AsyncClient(
+        http2=True,
+        timeout=httpx.Timeout(REQUEST_TIMEOUT),
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+    )
+
+
+@app.on_event('shutdown')
+async def close_http_client():
+    """Close the shared HTTP client and its pooled connections"""
+    await app.state.http.aclose()
+
+
+def _finish_job(job_id: str, job: dict) -> None:
+    """Move a job from the pending table to the expiring results cache"""
+    app.state.jobs.set(job_id, job)
+    app.state.pending_jobs.pop(job_id, None)
+
+
+async def generation_worker():
+    """Run queued generation jobs and store their outcome
+    
+    Each model's requests are paced to MODEL_RATE_LIMIT per minute; a
+    worker waits for its model's window instead of calling Perplexity.
+    """
+    queue = app.state.generation_queue
+    pending = app.state.pending_jobs
+    model_limiter = app.state.model_limiter
+    while True:
+        job_id, request = await queue.get()
+        try:
+            model = _model_name(request)
+            while not model_limiter.allow_request(model):
+                await asyncio.sleep(1)
+            pending[job_id] = {'job_id': job_id, 'status': 'running'}
+            result = await generate_content(request)
+            _finish_job(job_id, {
+                'job_id': job_id,
+                'status': 'completed',
+                'result': result.model_dump()
+            })
+        except HTTPException as e:
+            _finish_job(job_id, {'job_id': job_id, 'status': 'failed', 'error': str(e.detail)})
+        except Exception as e:
+            logger.error(f"Unexpected error in generation job {job_id}: {str(e)}")
+            _finish_job(job_id, {
+                'job_id': job_id,
+                'status': 'failed',
+                'error': f'Unexpected error: {str(e)}'
+            })
+        finally:
+            queue.task_done()
+
+
+@app.on_event('startup')
+async def start_generation_workers():
+    """Start the worker pool that serves /generate/async jobs"""
+    app.state.generation_queue = asyncio.Queue(maxsize=GENERATION_QUEUE_SIZE)
+    # Queued and running jobs are never evicted; the table is bounded by the
+    # queue size plus the worker count. Finished jobs expire from the cache.
+    app.state.pending_jobs = {}
+    app.state.jobs = LRUCache(max_size=10000, ttl=JOB_RESULT_TTL)
+    app.state.model_limiter = PerClientRateLimiter(
+        strategy='sliding_window', rate=MODEL_RATE_LIMIT, capacity=60
+    )
+    app.state.generation_workers = [
+        asyncio.create_task(generation_worker())
+        for _ in range(GENERATION_WORKERS)
+    ]
+    logger.info(f"Started {GENERATION_WORKERS} generation workers")
+
+
+@app.on_event('shutdown')
+async def stop_generation_workers():
+    """Cancel the generation workers"""
+    for worker in app.state.generation_workers:
+        worker.cancel()
+    await asyncio.gather(*app.state.generation_workers, return_exceptions=True)
+
+
+@app.on_event('startup')
+async def start_content_flushers():
+    """Start the view-count and analytics flushers behind /api/content"""
+    await content_routes.start_background_flushers()
+
+
+@app.on_event('shutdown')
+async def stop_content_flushers():
+    """Stop the content flushers, persisting anything still buffered"""
+    await content_routes.stop_background_flushers()
+
+
 @app.get('/health')
 async def health_check():
     """Health check endpoint"""
@@ -61,14 +345,15 @@ async def health_check():
         'status': 'healthy',
         'version': '2.0',
         'llm_provider': 'Perplexity Pro',
-        'api_configured': bool(PERPLEXITY_API_KEY)
+        'api_configured': bool(PERPLEXITY_API_KEY),
+        'timestamp': datetime.now(timezone.utc).isoformat()
     }
 
 
 @app.get('/config')
 async def get_config():
     """Get available platforms configuration"""
-    return {'platforms': list(config['platforms'].keys())}
+    return CONFIG_RESPONSE
 
 
 @app.post('/generate')
@@ -82,94 +367,17 @@ async def generate_content(request: ContentRequest) -> ContentResponse:
     - Better understanding of nuanced Russian satirical writing
     """
     
-    # Validate platform
-    if request.platform not in config['platforms']:
-        raise HTTPException(
-            status_code=400,
-            detail=f'Unknown platform: {request.platform}'
-        )
-    
-    platform_config = config['platforms'][request.platform]
-    if not platform_config['enabled']:
-        raise HTTPException(
-            status_code=400,
-            detail=f'Platform {request.platform} is disabled'
-        )
-    
-    # Check API key availability
-    if not PERPLEXITY_API_KEY:
-        raise HTTPException(
-            status_code=500,
-            detail='Perplexity API key not configured. Please set PERPLEXITY_API_KEY environment variable.'
-        )
-    
-    content_gen = config['content_generation']
-    
-    # Construct the prompt with Russian-specific satirical style
-    system_prompt = f"""
-    Ты профессиональный сатирический писатель, специализирующийся на русском юморе в стиле Задорнова и Жванецкого.
-    
-    Твоя задача: создавать остроумные, провокационные, но доступные сатирические тексты о современных lifestyle трендах.
-    
-    Стиль: {content_gen['tone']}
-    Целевая аудитория: {content_gen['target_audience']}
-    Язык: {request.language}
-    Платформа: {request.platform}
-    
-    Требования:
-    - Текст должен быть остроумным и провокационным, но не оскорбительным
-    - Используй современные примеры и культурные ссылки
-    - Сохраняй баланс между критикой и юмором
-    - Текст должен быть подходящим для публикации на {request.platform}
-    """
-    
-    user_message = f"""
-    Напиши сатирическую статью о: {request.topic}
-    
-    Длина: 800-1200 слов
-    Стиль: {request.style}
-    
-    Убедись, что текст:
-    1. Содержит острый социальный комментарий
-    2. Использует иронию и парадокс
-    3. Релевантен для целевой аудитории на {request.platform}
-    4. Может привлечь интерес к продуктам Faberlic (косметика и ухоз за собой)
-    """
+    platform_config = _validate_request(request)
     
     try:
         logger.info(f"Generating content for {request.platform} on topic: {request.topic}")
         
-        # Prepare request to Perplexity Pro API
-        headers = {
-            "Authorization": f"Bearer {PERPLEXITY_API_KEY}",
-            "Content-Type": "application/json"
-        }
-        
-        payload = {
-            "model": "pplx-70b-online" if request.use_search else "pplx-70b-chat",
-            "messages": [
-                {
-                    "role": "system",
-                    "content": system_prompt
-                },
-                {
-                    "role": "user",
-                    "content": user_message
-                }
-            ],
-            "temperature": 0.8,  # Higher temperature for more creative satire
-            "top_p": 0.9,
-            "max_tokens": 2000,
-            "presence_penalty": 0.6  # Encourage diversity in word usage
-        }
-        
-        # Make async request to Perplexity API
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                PERPLEXITY_API_URL,
-                headers=headers,
-                json=payload
-            )
+        # Make async request to Perplexity API over the pooled client
+        response = await app.state.http.post(
+            PERPLEXITY_API_URL,
+            headers=_perplexity_headers(),
+            json=_build_payload(request)
+        )
         
         if response.status_code != 200:
             error_detail = f"Perplexity API error: {response.status_code}"
@@ -194,7 +402,7 @@ async def generate_content(request: ContentRequest) -> ContentResponse:
             platform=request.platform,
             content=content,
             hashtags=hashtags,
-            timestamp=str(asyncio.get_event_loop().time()),
+            timestamp=datetime.now(timezone.utc).isoformat(),
             model=model_used
         )
         
@@ -214,44 +422,116 @@ async def generate_content(request: ContentRequest) -> ContentResponse:
         )
 
 
+@app.post('/generate/stream')
+async def generate_content_stream(request: ContentRequest):
+    """
+    Stream satirical content from Perplexity Pro as server-sent events
+    
+    Each event carries a JSON object with the next text fragment; the
+    stream ends with a `[DONE]` event. Tokens are forwarded as soon as
+    Perplexity produces them instead of waiting for the full completion.
+    """
+    _validate_request(request)
+    payload = _build_payload(request, stream=True)
+    logger.info(f"Streaming content for {request.platform} on topic: {request.topic}")
+    
+    async def event_stream():
+        try:
+            async with app.state.http.stream(
+                'POST',
+                PERPLEXITY_API_URL,
+                headers=_perplexity_headers(),
+                json=payload
+            ) as response:
+                if response.status_code != 200:
+                    error_detail = f"Perplexity API error: {response.status_code}"
+                    logger.error(error_detail)
+                    yield f"event: error\ndata: {json.dumps({'error': error_detail})}\n\n"
+                    return
+                
+                async for line in response.aiter_lines():
+                    content = _parse_sse_line(line)
+                    if content:
+                        yield f"data: {json.dumps({'content': content}, ensure_ascii=False)}\n\n"
+            
+            yield "data: [DONE]\n\n"
+            logger.info(f"Finished streaming content for {request.platform}")
+        except httpx.RequestError as e:
+            logger.error(f"HTTP request error while streaming: {str(e)}")
+            error_detail = f'Failed to reach Perplexity API: {str(e)}'
+            yield f"event: error\ndata: {json.dumps({'error': error_detail})}\n\n"
+    
+    return StreamingResponse(event_stream(), media_type='text/event-stream')
+
+
+@app.post('/generate/async', status_code=status.HTTP_202_ACCEPTED)
+async def enqueue_generation(request: ContentRequest):
+    """
+    Queue a generation job and return immediately
+    
+    The job is picked up by the background worker pool; poll
+    GET /generate/{job_id} for its status and result. When
+    GENERATION_QUEUE_SIZE jobs are already waiting the request is refused
+    with 503 and a Retry-After header.
+    """
+    _validate_request(request)
+    
+    job_id = str(uuid.uuid4())
+    try:
+        app.state.generation_queue.put_nowait((job_id, request))
+    except asyncio.QueueFull:
+        logger.warning(f"Generation queue full, refusing job for {request.platform}")
+        raise HTTPException(
+            status_code=503,
+            detail='Generation queue is full, retry later',
+            headers={'Retry-After': str(QUEUE_FULL_RETRY_AFTER)}
+        )
+    app.state.pending_jobs[job_id] = {'job_id': job_id, 'status': 'queued'}
+    logger.info(f"Queued generation job {job_id} for {request.platform}")
+    
+    return {'job_id': job_id, 'status': 'queued'}
+
+
+@app.get('/generate/{job_id}')
+async def get_generation_job(job_id: str):
+    """Get the status, and once finished the result, of a queued job"""
+    job = app.state.pending_jobs.get(job_id) or app.state.jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail='Job not found or expired')
+    return job
+
+
 @app.get('/platforms')
 async def list_platforms():
     """List all available platforms"""
-    return {
-        'platforms': [
-            {
-                'name': name,
-                'enabled': config['platforms'][name]['enabled'],
-                'schedule': config['platforms'][name]['posting_schedule'],
-                'content_type': config['platforms'][name]['content_type']
-            }
-            for name in config['platforms'].keys()
-        ],
-        'llm_provider': 'Perplexity Pro'
-    }
+    return PLATFORMS_RESPONSE
 
 
 @app.post('/batch')
-async def batch_generate(requests: List[ContentRequest]):
+async def batch_generate(requests: list[ContentRequest]):
     """
     Generate multiple content pieces at once
     
-    Note: Requests are processed sequentially to avoid rate limiting
+    Note: Requests run concurrently, at most BATCH_CONCURRENCY at a time
+    to stay within provider rate limits. Results keep the request order.
     """
-    results = []
-    for idx, req in enumerate(requests):
-        try:
-            logger.info(f"Processing batch request {idx + 1}/{len(requests)}")
-            result = await generate_content(req)
-            results.append(result)
-        except HTTPException as e:
-            logger.error(f"Error in batch request {idx + 1}: {e.detail}")
-            results.append({'error': str(e.detail)})
-        except Exception as e:
-            logger.error(f"Unexpected error in batch request {idx + 1}: {str(e)}")
-            results.append({'error': f'Unexpected error: {str(e)}'})
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
     
-    return results
+    async def generate_one(idx: int, req: ContentRequest):
+        async with semaphore:
+            try:
+                logger.info(f"Processing batch request {idx + 1}/{len(requests)}")
+                return await generate_content(req)
+            except HTTPException as e:
+                logger.error(f"Error in batch request {idx + 1}: {e.detail}")
+                return {'error': str(e.detail)}
+            except Exception as e:
+                logger.error(f"Unexpected error in batch request {idx + 1}: {str(e)}")
+                return {'error': f'Unexpected error: {str(e)}'}
+    
+    return await asyncio.gather(
+        *(generate_one(idx, req) for idx, req in enumerate(requests))
+    )
 
 
 if __name__ == '__main__':
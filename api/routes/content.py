@@ -4,23 +4,51 @@ Provides endpoints for creating, reading, updating, and deleting content.
 Includes authentication, rate limiting, and analytics tracking.
 """
 
-from typing import List, Optional
-from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from collections import Counter
+from datetime import datetime
 from uuid import UUID
 from http import HTTPStatus
+import asyncio
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Header, Request, status
-from sqlalchemy.orm import Session
-from pydantic import BaseModel, Field
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import bindparam, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload
+from pydantic import BaseModel, ConfigDict, Field
 import logging
 
-from database.db_config import get_session
+from analytics.event_flusher import get_analytics_flusher
+from caching.cache_manager import LRUCache
+from analytics.event_tracking import get_event_tracker
+from database.db_config import get_async_session, get_async_session_manager
 from database.models import Content, User, Analytics
 from security.cors_config import SecurityConfig
 from monitoring.metrics import MetricsCollector
 
 logger = logging.getLogger(__name__)
-router = APIRouter(prefix="/api/content", tags=["content"])
+router = APIRouter(
+    prefix="/api/content",
+    tags=["content"],
+    default_response_class=ORJSONResponse,
+)
+
+# Buffered view counts, flushed to the database every VIEW_FLUSH_INTERVAL seconds
+VIEW_FLUSH_INTERVAL = 5
+view_counter: Counter = Counter()
+_view_counter_lock = asyncio.Lock()
+_view_flush_task: Optional[asyncio.Task] = None
+
+# Short-lived cache of serialized content for hot reads, keyed by content ID
+content_cache = LRUCache(max_size=1024, ttl=30)
+
+_content_table = Content.__table__
+_increment_views = (
+    update(_content_table)
+    .where(_content_table.c.id == bindparam("content_id"))
+    .values(views=_content_table.c.views + bindparam("delta"))
+)
 
 
 # Request/Response Schemas
@@ -31,7 +59,7 @@ class ContentCreate(BaseModel):
     style: str = Field(..., description="e.g., satirical, witty, sharp")
     language: str = Field(default="ru", max_length=10)
     prompt: Optional[str] = Field(None, description="Original prompt used")
-    tags: Optional[str] = Field(None, description="Comma-separated tags")
+    tags: Optional[List[str]] = Field(None, description="Tags")
 
 
 class ContentUpdate(BaseModel):
@@ -39,11 +67,13 @@ class ContentUpdate(BaseModel):
     title: Optional[str] = Field(None, min_length=5, max_length=500)
     body: Optional[str] = Field(None, min_length=50)
     style: Optional[str] = None
-    tags: Optional[str] = None
+    tags: Optional[List[str]] = None
 
 
 class ContentResponse(BaseModel):
     """Schema for content responses."""
+    model_config = ConfigDict(from_attributes=True)
+
     id: UUID
     title: str
     body: str
@@ -54,13 +84,13 @@ class ContentResponse(BaseModel):
     created_at: datetime
     published_at: Optional[datetime]
 
-    class Config:
-        from_attributes = True
-
 
 def get_current_user(authorization: Optional[str] = Header(None)) -> User:
     """Extract user from authorization header.
     
+    Used as a route dependency so unauthenticated requests are rejected
+    with 401 before the request body is validated.
+    
     TODO: Implement proper JWT validation
     """
     if not authorization:
@@ -72,12 +102,16 @@ def get_current_user(authorization: Optional[str] = Header(None)) -> User:
     return None
 
 
-@router.post("/", response_model=ContentResponse, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/",
+    response_model=ContentResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(get_current_user)],
+)
 async def create_content(
     content_in: ContentCreate,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     request: Request = None,
-    authorization: Optional[str] = Header(None),
 ) -> Content:
     """Create new content.
     
@@ -87,12 +121,6 @@ async def create_content(
     Raises:
         HTTPException: If user is not authenticated or validation fails
     """
-    if not authorization:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Missing authorization header"
-        )
-    
     try:
         # Create new content record
         new_content = Content(
@@ -106,27 +134,26 @@ async def create_content(
             status="draft",
             tags=content_in.tags,
         )
-        session.add(new_content)
-        session.flush()
         
-        # Track analytics
+        # Track analytics in the same unit of work: the relationship lets the
+        # flush fill in content_id, so both rows go out in one commit
         analytics = Analytics(
             user_id=None,
-            content_id=new_content.id,
+            content=new_content,
             event_type="create",
             event_category="content",
             endpoint="/api/content",
             method="POST",
             status_code=201,
         )
-        session.add(analytics)
-        session.commit()
+        session.add_all([new_content, analytics])
+        await session.commit()
         
         logger.info(f"Content created: {new_content.id}")
         return new_content
         
     except Exception as e:
-        session.rollback()
+        await session.rollback()
         logger.error(f"Error creating content: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -137,10 +164,12 @@ async def create_content(
 @router.get("/{content_id}", response_model=ContentResponse)
 async def get_content(
     content_id: UUID,
-    session: Session = Depends(get_session),
-) -> Content:
+    session: AsyncSession = Depends(get_async_session),
+) -> ContentResponse:
     """Get content by ID.
     
+    Popular content is served from a short-lived in-process cache.
+    
     Args:
         content_id: UUID of the content
     
@@ -150,65 +179,153 @@ async def get_content(
     Raises:
         HTTPException: If content not found
     """
-    content = session.query(Content).filter(Content.id == content_id).first()
+    response = content_cache.get(content_id)
     
-    if not content:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Content not found"
-        )
+    if response is None:
+        content = await session.get(Content, content_id)
+        
+        if not content:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Content not found"
+            )
+        
+        response = ContentResponse.model_validate(content)
+        content_cache.set(content_id, response)
     
-    # Increment views
-    content.views += 1
-    session.commit()
-    
-    # Track analytics
-    analytics = Analytics(
-        content_id=content.id,
-        event_type="view",
-        event_category="content",
-        endpoint="/api/content/{content_id}",
-        method="GET",
-        status_code=200,
-    )
-    session.add(analytics)
-    session.commit()
+    # Count the view in memory; the flush loop persists it in bulk
+    async with _view_counter_lock:
+        view_counter[content_id] += 1
     
-    return content
+    get_event_tracker().track_event("view", {
+        "content_id": str(content_id),
+        "event_category": "content",
+        "endpoint": "/api/content/{content_id}",
+        "method": "GET",
+        "status_code": 200,
+    })
+    
+    return response
+
+
+async def flush_view_counts() -> int:
+    """Persist buffered view counts with a single executemany UPDATE.
+    
+    Returns:
+        Number of content rows updated
+    """
+    async with _view_counter_lock:
+        pending: Dict[UUID, int] = dict(view_counter)
+        view_counter.clear()
+    
+    if not pending:
+        return 0
+    
+    try:
+        async with get_async_session_manager().session_scope() as session:
+            await session.execute(
+                _increment_views,
+                [{"content_id": cid, "delta": delta} for cid, delta in pending.items()],
+            )
+    except Exception as e:
+        # Put the counts back so the next flush retries them
+        async with _view_counter_lock:
+            view_counter.update(pending)
+        logger.error(f"Error flushing view counts: {str(e)}")
+        return 0
+    
+    return len(pending)
+
+
+async def _view_flush_loop() -> None:
+    """Periodically flush buffered view counts."""
+    while True:
+        await asyncio.sleep(VIEW_FLUSH_INTERVAL)
+        await flush_view_counts()
+
+
+async def start_background_flushers() -> None:
+    """Start the view-count and analytics flushers.
+    
+    Called from the application's startup hook in api.py.
+    """
+    global _view_flush_task
+    if _view_flush_task is None:
+        _view_flush_task = asyncio.create_task(_view_flush_loop())
+    get_analytics_flusher().start()
+
+
+async def stop_background_flushers() -> None:
+    """Stop the flushers and persist anything still buffered.
+    
+    Called from the application's shutdown hook in api.py.
+    """
+    global _view_flush_task
+    if _view_flush_task is not None:
+        _view_flush_task.cancel()
+        _view_flush_task = None
+    await flush_view_counts()
+    await get_analytics_flusher().stop()
 
 
 @router.get("/", response_model=List[ContentResponse])
 async def list_content(
-    skip: int = Query(0, ge=0),
+    cursor: Optional[datetime] = Query(
+        None, description="created_at of the last item from the previous page"
+    ),
+    cursor_id: Optional[UUID] = Query(
+        None, description="id of the last item from the previous page"
+    ),
     limit: int = Query(10, ge=1, le=100),
     status_filter: Optional[str] = Query(None, description="Filter by status"),
-    session: Session = Depends(get_session),
+    tags: Optional[List[str]] = Query(None, description="Match any of these tags"),
+    session: AsyncSession = Depends(get_async_session),
 ) -> List[Content]:
-    """List content with pagination.
+    """List content with keyset pagination, newest first.
+    
+    Pass the created_at and id of the last item of a page as cursor and
+    cursor_id to get the next page; this stays an index range scan at any
+    depth. The id breaks ties between items created at the same instant,
+    so none are skipped or repeated across pages.
     
     Args:
-        skip: Number of items to skip
+        cursor: Return only items created before this timestamp
+        cursor_id: Together with cursor, return only items ordered after
+            this one; without it, items sharing the cursor timestamp are
+            skipped
         limit: Number of items to return
         status_filter: Filter by status (draft, published, archived)
+        tags: Return only items sharing at least one of these tags
     
     Returns:
         List of content
     """
-    query = session.query(Content)
+    # Relationships are not part of the response; fail loudly instead of
+    # lazy loading one row at a time if that changes
+    stmt = select(Content).options(raiseload("*"))
     
     if status_filter:
-        query = query.filter(Content.status == status_filter)
+        stmt = stmt.where(Content.status == status_filter)
+    if cursor is not None and cursor_id is not None:
+        stmt = stmt.where(tuple_(Content.created_at, Content.id) < tuple_(cursor, cursor_id))
+    elif cursor is not None:
+        stmt = stmt.where(Content.created_at < cursor)
+    if tags:
+        stmt = stmt.where(Content.tags.overlap(tags))
     
-    contents = query.order_by(Content.created_at.desc()).offset(skip).limit(limit).all()
-    return contents
+    stmt = stmt.order_by(Content.created_at.desc(), Content.id.desc()).limit(limit)
+    return (await session.scalars(stmt)).all()
 
 
-@router.patch("/{content_id}", response_model=ContentResponse)
+@router.patch(
+    "/{content_id}",
+    response_model=ContentResponse,
+    dependencies=[Depends(get_current_user)],
+)
 async def update_content(
     content_id: UUID,
     content_in: ContentUpdate,
-    session: Session = Depends(get_session),
-    authorization: Optional[str] = Header(None),
+    session: AsyncSession = Depends(get_async_session),
 ) -> Content:
     """Update content.
     
@@ -222,13 +339,7 @@ async def update_content(
     Raises:
         HTTPException: If content not found or unauthorized
     """
-    if not authorization:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Missing authorization header"
-        )
-    
-    content = session.query(Content).filter(Content.id == content_id).first()
+    content = await session.get(Content, content_id)
     
     if not content:
         raise HTTPException(
@@ -246,18 +357,22 @@ async def update_content(
     if content_in.tags is not None:
         content.tags = content_in.tags
     
-    content.updated_at = datetime.now(timezone.utc)
-    session.commit()
+    # updated_at is stamped by the database via the model's onupdate=func.now()
+    await session.commit()
+    content_cache.delete(content_id)
     
     logger.info(f"Content updated: {content.id}")
     return content
 
 
-@router.delete("/{content_id}", status_code=status.HTTP_204_NO_CONTENT)
+@router.delete(
+    "/{content_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[Depends(get_current_user)],
+)
 async def delete_content(
     content_id: UUID,
-    session: Session = Depends(get_session),
-    authorization: Optional[str] = Header(None),
+    session: AsyncSession = Depends(get_async_session),
 ) -> None:
     """Delete content (archive it).
     
@@ -267,13 +382,7 @@ async def delete_content(
     Raises:
         HTTPException: If content not found or unauthorized
     """
-    if not authorization:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Missing authorization header"
-        )
-    
-    content = session.query(Content).filter(Content.id == content_id).first()
+    content = await session.get(Content, content_id)
     
     if not content:
         raise HTTPException(
@@ -283,6 +392,7 @@ async def delete_content(
     
     # Soft delete: mark as archived instead of deleting
     content.status = "archived"
-    session.commit()
+    await session.commit()
+    content_cache.delete(content_id)
     
     logger.info(f"Content archived: {content.id}")
@@ -4,19 +4,55 @@ Provides JWT token generation, validation, and refresh mechanisms.
 Includes password hashing and user verification.
 """
 
-from datetime import datetime, timedelta, timezone
-from typing import Optional, Dict, Any
+from datetime import timedelta
+from typing import Optional, Dict, Any, Literal, NamedTuple, Tuple, Union
 from uuid import UUID
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import base64
+import hashlib
+import hmac
 import logging
 import os
+import re
+import time
 import jwt
+import orjson
 from passlib.context import CryptContext
-from pydantic import BaseModel
+from pydantic import AliasChoices, BaseModel, ConfigDict, Field, field_validator
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from caching.cache_manager import LRUCache
+from database.models import User
 
 logger = logging.getLogger(__name__)
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing: new hashes use Argon2id; existing bcrypt hashes still
+# verify and are flagged for rehashing on the next successful login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", "4"))
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    deprecated=["bcrypt"],
+    argon2__type="ID",
+    argon2__time_cost=2,
+    argon2__memory_cost=65536,
+    argon2__parallelism=ARGON2_PARALLELISM,
+    bcrypt__rounds=BCRYPT_ROUNDS,
+)
+
+# argon2 and bcrypt release the GIL, so async callers hash on this pool in parallel
+# instead of blocking the event loop
+_password_executor = ThreadPoolExecutor(
+    max_workers=os.cpu_count(),
+    thread_name_prefix="password-hash",
+)
+
+# Recently verified passwords, keyed by stored hash. Values are
+# HMAC-SHA256(pepper, plain | hashed) digests, so a dumped cache cannot be
+# replayed without the pepper. Only successful verifications are cached.
+PASSWORD_CACHE_PEPPER = os.getenv("PASSWORD_CACHE_PEPPER", "").encode() or os.urandom(32)
+_verified_passwords = LRUCache(max_size=4096, ttl=300, num_stripes=16)
 
 # JWT configuration
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your-secret-key-change-in-production")
@@ -24,20 +60,129 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 REFRESH_TOKEN_EXPIRE_DAYS = 7
 
+# HS256 tokens are signed and checked here directly; PyJWT handles any
+# other algorithm and tokens whose header differs from the one we issue
+_KEY = SECRET_KEY.encode()
+
+
+def _b64url_encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+# Unpadded base64url; urlsafe_b64decode silently skips any other byte
+_B64URL_SEGMENT = re.compile(rb"[A-Za-z0-9_-]*")
+
+
+def _b64url_decode(data: bytes) -> bytes:
+    if not _B64URL_SEGMENT.fullmatch(data):
+        raise ValueError("Invalid base64url segment")
+    return base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+
+
+def encode_user_id(user_id: Union[UUID, str]) -> str:
+    """Encode a user ID as the 22-character base64url "uid" claim.
+
+    Accepts a UUID, its 36-character string form, or an already encoded uid.
+    """
+    if isinstance(user_id, str):
+        if len(user_id) == 22:
+            return user_id
+        user_id = UUID(user_id)
+    return _b64url_encode(user_id.bytes).decode()
+
+
+def decode_user_id(value: str) -> UUID:
+    """Decode a "uid" claim, or a legacy 36-character user_id, to a UUID."""
+    if len(value) == 22:
+        return UUID(bytes=_b64url_decode(value.encode()))
+    return UUID(value)
+
+
+_HEADER_SEGMENT = _b64url_encode(orjson.dumps({"alg": ALGORITHM, "typ": "JWT"}))
+
+
+def _encode_token(payload: Dict[str, Any]) -> str:
+    """Encode and sign a JWT."""
+    if ALGORITHM != "HS256":
+        return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
+
+    signing_input = _HEADER_SEGMENT + b"." + _b64url_encode(orjson.dumps(payload))
+    signature = hmac.new(_KEY, signing_input, hashlib.sha256).digest()
+    return (signing_input + b"." + _b64url_encode(signature)).decode()
+
+
+def _decode_token(token: str) -> Dict[str, Any]:
+    """Verify a JWT signature and its exp/nbf claims.
+
+    Raises:
+        jwt.InvalidTokenError: If the token is malformed, forged or not
+            yet valid (jwt.ExpiredSignatureError if it has expired)
+    """
+    raw = token.encode()
+    header, sep, rest = raw.partition(b".")
+    if ALGORITHM != "HS256" or header != _HEADER_SEGMENT:
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+
+    body, sep, signature = rest.partition(b".")
+    if not sep:
+        raise jwt.DecodeError("Not enough segments")
+    if b"." in signature:
+        raise jwt.DecodeError("Too many segments")
+    expected = hmac.new(_KEY, header + b"." + body, hashlib.sha256).digest()
+    try:
+        valid = hmac.compare_digest(_b64url_decode(signature), expected)
+        payload = orjson.loads(_b64url_decode(body)) if valid else None
+    except (ValueError, orjson.JSONDecodeError) as e:
+        raise jwt.DecodeError(f"Invalid token encoding: {e}")
+    if not valid:
+        raise jwt.InvalidSignatureError("Signature verification failed")
+    if not isinstance(payload, dict):
+        raise jwt.DecodeError("Invalid payload")
+
+    now = time.time()
+    if "exp" in payload and payload["exp"] <= now:
+        raise jwt.ExpiredSignatureError("Signature has expired")
+    if "nbf" in payload and payload["nbf"] > now:
+        raise jwt.ImmatureSignatureError("The token is not yet valid (nbf)")
+    return payload
+
 
 class TokenPayload(BaseModel):
     """JWT token payload structure."""
-    user_id: UUID
+    model_config = ConfigDict(frozen=True)
+
+    user_id: UUID = Field(validation_alias=AliasChoices("uid", "user_id"))
     email: str
     username: str
     is_admin: bool = False
-    exp: Optional[datetime] = None
-    iat: Optional[datetime] = None
-    token_type: str = "access"  # access or refresh
+    exp: Optional[int] = None  # NumericDate (seconds since epoch)
+    iat: Optional[int] = None
+    token_type: Literal["access", "refresh"] = "access"
+
+    @field_validator("user_id", mode="before")
+    @classmethod
+    def _decode_uid(cls, value: Any) -> Any:
+        """Accept the compact base64 "uid" form as well as a UUID string."""
+        if isinstance(value, str) and len(value) == 22:
+            return decode_user_id(value)
+        return value
+
+
+class TokenClaims(NamedTuple):
+    """Verified token claims without model validation."""
+    user_id: UUID
+    email: str
+    username: str
+    is_admin: bool
+    exp: Optional[int]
+    iat: Optional[int]
+    token_type: str
 
 
 class TokenResponse(BaseModel):
     """Token response structure."""
+    model_config = ConfigDict(frozen=True)
+
     access_token: str
     refresh_token: Optional[str] = None
     token_type: str = "bearer"
@@ -49,7 +194,7 @@ class PasswordUtils:
 
     @staticmethod
     def hash_password(password: str) -> str:
-        """Hash password using bcrypt.
+        """Hash password using Argon2id.
 
         Args:
             password: Plain text password
@@ -59,10 +204,80 @@ class PasswordUtils:
         """
         return pwd_context.hash(password)
 
+    @staticmethod
+    def _password_digest(plain_password: str, hashed_password: str) -> bytes:
+        """Peppered HMAC of a (password, hash) pair for the verify cache."""
+        message = plain_password.encode() + b"|" + hashed_password.encode()
+        return hmac.new(PASSWORD_CACHE_PEPPER, message, hashlib.sha256).digest()
+
     @staticmethod
     def verify_password(plain_password: str, hashed_password: str) -> bool:
         """Verify password against hash.
 
+        Repeat verifications of the same pair within five minutes are
+        answered from an HMAC cache instead of re-running the password
+        hash (Argon2id, or bcrypt for legacy hashes).
+
+        Args:
+            plain_password: Plain text password
+            hashed_password: Hashed password from database
+
+        Returns:
+            True if passwords match, False otherwise
+        """
+        digest = PasswordUtils._password_digest(plain_password, hashed_password)
+        cached = _verified_passwords.get(hashed_password)
+        if cached is not None and hmac.compare_digest(cached, digest):
+            return True
+
+        verified = pwd_context.verify(plain_password, hashed_password)
+        if verified:
+            _verified_passwords.set(hashed_password, digest)
+        return verified
+
+    @staticmethod
+    def verify_and_update(
+        plain_password: str, hashed_password: str
+    ) -> Tuple[bool, Optional[str]]:
+        """Verify password and upgrade legacy hashes.
+
+        Callers should store the returned hash on the user record when it
+        is not None (e.g. a bcrypt hash that verified and was re-hashed
+        with Argon2id); authenticate_user does this for logins.
+
+        Args:
+            plain_password: Plain text password
+            hashed_password: Hashed password from database
+
+        Returns:
+            Tuple of (verified, new hash or None)
+        """
+        verified, new_hash = pwd_context.verify_and_update(
+            plain_password, hashed_password
+        )
+        if new_hash is not None:
+            logger.info("Password hash upgraded to Argon2id")
+        return verified, new_hash
+
+    @staticmethod
+    async def ahash_password(password: str) -> str:
+        """Hash password on the password thread pool.
+
+        Args:
+            password: Plain text password
+
+        Returns:
+            Hashed password
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _password_executor, PasswordUtils.hash_password, password
+        )
+
+    @staticmethod
+    async def averify_password(plain_password: str, hashed_password: str) -> bool:
+        """Verify password against hash on the password thread pool.
+
         Args:
             plain_password: Plain text password
             hashed_password: Hashed password from database
@@ -70,7 +285,66 @@ class PasswordUtils:
         Returns:
             True if passwords match, False otherwise
         """
-        return pwd_context.verify(plain_password, hashed_password)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _password_executor,
+            PasswordUtils.verify_password,
+            plain_password,
+            hashed_password,
+        )
+
+    @staticmethod
+    async def averify_and_update(
+        plain_password: str, hashed_password: str
+    ) -> Tuple[bool, Optional[str]]:
+        """Verify password and upgrade legacy hashes on the password thread pool.
+
+        Args:
+            plain_password: Plain text password
+            hashed_password: Hashed password from database
+
+        Returns:
+            Tuple of (verified, new hash or None)
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _password_executor,
+            PasswordUtils.verify_and_update,
+            plain_password,
+            hashed_password,
+        )
+
+
+async def authenticate_user(
+    session: AsyncSession, login: str, password: str
+) -> Optional[User]:
+    """Look up and verify the user for a login.
+
+    A legacy bcrypt hash that verifies is replaced with its Argon2id
+    re-hash and committed, so each account migrates on its next
+    successful login.
+
+    Args:
+        session: Async database session
+        login: Email or username, matched case-insensitively
+        password: Plain text password
+
+    Returns:
+        The authenticated user, or None if the login or password is wrong
+    """
+    user = await session.scalar(User.by_login(login))
+    if user is None:
+        return None
+
+    verified, new_hash = await PasswordUtils.averify_and_update(
+        password, user.password_hash
+    )
+    if not verified:
+        return None
+    if new_hash is not None:
+        user.password_hash = new_hash
+        await session.commit()
+    return user
 
 
 class JWTUtils:
@@ -78,7 +352,7 @@ class JWTUtils:
 
     @staticmethod
     def create_access_token(
-        user_id: UUID,
+        user_id: Union[UUID, str],
         email: str,
         username: str,
         is_admin: bool = False,
@@ -99,11 +373,11 @@ class JWTUtils:
         if expires_delta is None:
             expires_delta = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
 
-        now = datetime.now(timezone.utc)
-        expire = now + expires_delta
+        now = int(time.time())
+        expire = now + int(expires_delta.total_seconds())
 
         payload = {
-            "user_id": str(user_id),
+            "uid": encode_user_id(user_id),
             "email": email,
             "username": username,
             "is_admin": is_admin,
@@ -112,13 +386,13 @@ class JWTUtils:
             "exp": expire,
         }
 
-        encoded_jwt = jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
+        encoded_jwt = _encode_token(payload)
         logger.info(f"Access token created for user: {username}")
         return encoded_jwt
 
     @staticmethod
     def create_refresh_token(
-        user_id: UUID,
+        user_id: Union[UUID, str],
         email: str,
         username: str,
         expires_delta: Optional[timedelta] = None,
@@ -137,11 +411,11 @@ class JWTUtils:
         if expires_delta is None:
             expires_delta = timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
 
-        now = datetime.now(timezone.utc)
-        expire = now + expires_delta
+        now = int(time.time())
+        expire = now + int(expires_delta.total_seconds())
 
         payload = {
-            "user_id": str(user_id),
+            "uid": encode_user_id(user_id),
             "email": email,
             "username": username,
             "token_type": "refresh",
@@ -149,7 +423,7 @@ class JWTUtils:
             "exp": expire,
         }
 
-        encoded_jwt = jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
+        encoded_jwt = _encode_token(payload)
         logger.info(f"Refresh token created for user: {username}")
         return encoded_jwt
 
@@ -188,25 +462,20 @@ class JWTUtils:
         }
 
     @staticmethod
-    def verify_token(token: str, token_type: str = "access") -> Optional[TokenPayload]:
-        """Verify and decode JWT token.
+    def verify_token_raw(
+        token: str, token_type: str = "access"
+    ) -> Optional[Dict[str, Any]]:
+        """Verify JWT token and return its decoded claims dict.
 
         Args:
             token: JWT token string
             token_type: Expected token type (access or refresh)
 
         Returns:
-            TokenPayload if valid, None if invalid
+            Decoded claims if valid, None if invalid
         """
         try:
-            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-
-            # Verify token type
-            if payload.get("token_type") != token_type:
-                logger.warning(f"Token type mismatch: expected {token_type}")
-                return None
-
-            return TokenPayload(**payload)
+            payload = _decode_token(token)
         except jwt.ExpiredSignatureError:
             logger.warning("Token has expired")
             return None
@@ -217,6 +486,50 @@ class JWTUtils:
             logger.error(f"Unexpected error verifying token: {str(e)}")
             return None
 
+        # Verify token type
+        if payload.get("token_type") != token_type:
+            logger.warning(f"Token type mismatch: expected {token_type}")
+            return None
+        return payload
+
+    @staticmethod
+    def verify_token(
+        token: str, token_type: str = "access", strict: bool = False
+    ) -> Optional[Union[TokenClaims, TokenPayload]]:
+        """Verify and decode JWT token.
+
+        By default the claims are returned as a lightweight TokenClaims
+        tuple; pass strict=True to get a fully validated TokenPayload
+        instead.
+
+        Args:
+            token: JWT token string
+            token_type: Expected token type (access or refresh)
+            strict: Validate the claims into a TokenPayload model
+
+        Returns:
+            TokenClaims (or TokenPayload if strict) if valid, None if invalid
+        """
+        payload = JWTUtils.verify_token_raw(token, token_type)
+        if payload is None:
+            return None
+
+        try:
+            if strict:
+                return TokenPayload(**payload)
+            return TokenClaims(
+                decode_user_id(payload.get("uid") or payload["user_id"]),
+                payload["email"],
+                payload["username"],
+                payload.get("is_admin", False),
+                payload.get("exp"),
+                payload.get("iat"),
+                token_type,
+            )
+        except Exception as e:
+            logger.error(f"Unexpected error verifying token: {str(e)}")
+            return None
+
     @staticmethod
     def refresh_access_token(refresh_token: str) -> Optional[str]:
         """Generate new access token from refresh token.
@@ -227,17 +540,18 @@ class JWTUtils:
         Returns:
             New access token if refresh token is valid, None otherwise
         """
-        payload = JWTUtils.verify_token(refresh_token, token_type="refresh")
+        payload = JWTUtils.verify_token_raw(refresh_token, token_type="refresh")
 
         if not payload:
             logger.warning("Invalid or expired refresh token")
             return None
 
+        # The encoded uid is carried over as-is
         new_access_token = JWTUtils.create_access_token(
-            user_id=UUID(payload.user_id),
-            email=payload.email,
-            username=payload.username,
-            is_admin=payload.is_admin,
+            user_id=payload.get("uid") or payload["user_id"],
+            email=payload["email"],
+            username=payload["username"],
+            is_admin=payload.get("is_admin", False),
         )
-        logger.info(f"Access token refreshed for user: {payload.username}")
+        logger.info(f"Access token refreshed for user: {payload['username']}")
         return new_access_token
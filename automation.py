@@ -1,19 +1,98 @@
 import asyncio
 import logging
+import os
+import re
+import time
 from datetime import datetime, timedelta
-import requests
+import httpx
 import yaml
-from typing import Dict, List
+from typing import Dict, List, Set, Tuple
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+_TIME_PATTERN = re.compile(r'\b\d{1,2}:\d{2}\b')
+
+# Indexed like datetime.weekday(): 0 is Monday
+WEEKDAYS = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+_WEEKDAY_PATTERN = re.compile(r'\b(' + '|'.join(WEEKDAYS) + r')\b', re.IGNORECASE)
+
+# Parsed configs keyed by path, with the file mtime they were read at
+_config_cache: Dict[str, Tuple[float, Dict]] = {}
+
+
+def load_config(config_path: str = 'config.yml') -> Dict:
+    '''Load a YAML config, re-parsing only when the file has changed'''
+    mtime = os.stat(config_path).st_mtime
+    cached = _config_cache.get(config_path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    
+    with open(config_path, 'r') as f:
+        config = yaml.load(f, Loader=SafeLoader)
+    _config_cache[config_path] = (mtime, config)
+    return config
+
+
+def schedule_times(schedule: Dict) -> Dict[int, Set[str]]:
+    '''Map each weekday (0 = Monday) to its HH:MM posting times
+    
+    Keys name a weekday, or are 'daily' for every day; any other key
+    (e.g. weekly: 'sunday 19:00') takes its weekdays from the value.
+    '''
+    times: Dict[int, Set[str]] = {day: set() for day in range(len(WEEKDAYS))}
+    for key, value in schedule.items():
+        key = str(key).lower()
+        if key == 'daily':
+            days = list(times)
+        elif key in WEEKDAYS:
+            days = [WEEKDAYS.index(key)]
+        else:
+            days = [WEEKDAYS.index(day.lower()) for day in _WEEKDAY_PATTERN.findall(str(value))]
+        hhmms = {
+            hhmm if len(hhmm) == 5 else f'0{hhmm}'
+            for hhmm in _TIME_PATTERN.findall(str(value))
+        }
+        for day in days:
+            times[day] |= hhmms
+    return times
+
+
 class SocialMediaAutomation:
     def __init__(self, config_path='config.yml'):
-        with open(config_path, 'r') as f:
-            self.config = yaml.safe_load(f)
+        self.config_path = config_path
+        self._load_config()
         self.api_base_url = 'http://localhost:8000'
         self.schedule_cache = {}
+        self._posters = {
+            'instagram': self._post_instagram,
+            'tiktok': self._post_tiktok,
+            'facebook': self._post_facebook,
+            'youtube': self._post_youtube,
+        }
+        self._http = httpx.AsyncClient(
+            base_url=self.api_base_url,
+            timeout=30,
+            limits=httpx.Limits(max_keepalive_connections=20)
+        )
+    
+    async def aclose(self) -> None:
+        '''Close the pooled HTTP client'''
+        await self._http.aclose()
+    
+    def _load_config(self) -> None:
+        '''(Re)load the config and precompute per-platform weekday posting times'''
+        self.config = load_config(self.config_path)
+        self._language = self.config.get('content_generation', {}).get('language', 'en')
+        self._schedule_sets = {
+            platform: schedule_times(platform_config['posting_schedule'])
+            for platform, platform_config in self.config['platforms'].items()
+        }
     
     def get_posting_schedule(self, platform: str) -> List[str]:
         '''Get posting times for a platform'''
@@ -25,12 +104,12 @@ class SocialMediaAutomation:
         '''Generate content via API and post to platform'''
         try:
             # Call API to generate content
-            response = requests.post(
-                f'{self.api_base_url}/generate',
+            response = await self._http.post(
+                '/generate',
                 json={
                     'platform': platform,
                     'topic': topic,
-                    'language': self.config['content_generation'].get('language', 'en')
+                    'language': self._language
                 }
             )
             response.raise_for_status()
@@ -52,16 +131,10 @@ class SocialMediaAutomation:
             return {'status': 'skipped', 'reason': 'platform disabled'}
         
         # Platform-specific posting logic
-        if platform == 'instagram':
-            return await self._post_instagram(content)
-        elif platform == 'tiktok':
-            return await self._post_tiktok(content)
-        elif platform == 'facebook':
-            return await self._post_facebook(content)
-        elif platform == 'youtube':
-            return await self._post_youtube(content)
-        else:
+        poster = self._posters.get(platform)
+        if poster is None:
             return {'error': 'platform not supported'}
+        return await poster(content)
     
     async def _post_instagram(self, content: Dict) -> Dict:
         '''Post to Instagram'''
@@ -100,21 +173,35 @@ class SocialMediaAutomation:
         '''Main scheduler loop'''
         logger.info('Starting Faberlic Satire content automation scheduler')
         while True:
-            current_time = datetime.now().strftime('%H:%M')
+            # Pick up config.yml edits without restarting
+            if load_config(self.config_path) is not self.config:
+                self._load_config()
+                logger.info('Configuration reloaded')
+            
+            now = datetime.now()
+            current_time = now.strftime('%H:%M')
+            weekday = now.weekday()
             
-            for platform, platform_config in self.config['platforms'].items():
-                if not platform_config['enabled']:
-                    continue
-                
-                schedule = platform_config['posting_schedule']
-                if current_time in str(schedule).split(','):
-                    await self.generate_and_post_content(platform, f'{platform} daily content')
+            # Platforms due in the same minute are posted concurrently
+            due = [
+                self.generate_and_post_content(platform, f'{platform} daily content')
+                for platform, platform_config in self.config['platforms'].items()
+                if platform_config['enabled']
+                and current_time in self._schedule_sets[platform][weekday]
+            ]
+            if due:
+                await asyncio.gather(*due, return_exceptions=True)
             
-            await asyncio.sleep(60)  # Check every minute
+            # Check every minute, aligned to the minute boundary so ticks
+            # do not drift by the time spent posting
+            await asyncio.sleep(60 - time.time() % 60)
 
 async def main():
     automation = SocialMediaAutomation()
-    await automation.run_scheduler()
+    try:
+        await automation.run_scheduler()
+    finally:
+        await automation.aclose()
 
 if __name__ == '__main__':
     asyncio.run(main())
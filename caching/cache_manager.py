@@ -11,8 +11,11 @@ Supports:
 import time
 import json
 import hashlib
+import heapq
+import itertools
 import logging
-from typing import Any, Optional, Dict, Callable
+import pickle
+from typing import Any, Optional, Dict, Callable, List, Tuple
 from functools import wraps
 from collections import OrderedDict
 from threading import Lock
@@ -23,109 +26,189 @@ logger = logging.getLogger(__name__)
 
 
 class CacheEntry:
-    """Represents a single cache entry with TTL"""
+    """Represents a single cache entry with TTL
+    
+    Expiry is tracked as an absolute time.monotonic() deadline, so wall-clock
+    adjustments cannot expire or revive entries.
+    """
+    __slots__ = ('value', 'expire_at', 'access_count', 'last_accessed')
+    
     def __init__(self, value: Any, ttl: Optional[int] = None):
         self.value = value
-        self.created_at = time.time()
-        self.ttl = ttl
+        self.last_accessed = time.monotonic()
+        self.expire_at = None if ttl is None else self.last_accessed + ttl
         self.access_count = 0
-        self.last_accessed = self.created_at
     
-    def is_expired(self) -> bool:
+    def is_expired(self, now: Optional[float] = None) -> bool:
         """Check if entry has expired"""
-        if self.ttl is None:
-            return False
-        return time.time() - self.created_at > self.ttl
+        return self.expire_at is not None and (now or time.monotonic()) > self.expire_at
     
     def access(self) -> Any:
         """Access the value and update access metadata"""
-        if self.is_expired():
+        now = time.monotonic()
+        if self.is_expired(now):
             return None
-        self.last_accessed = time.time()
+        self.last_accessed = now
         self.access_count += 1
         return self.value
 
 
+class _CacheStripe:
+    """One independently locked LRU segment of an LRUCache"""
+    __slots__ = ('cache', 'lock', 'max_size', 'hits', 'misses', 'expiry_heap', 'seq')
+    
+    def __init__(self, max_size: int):
+        self.cache: OrderedDict = OrderedDict()
+        self.lock = Lock()
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        # (expire_at, seq, key, entry); seq breaks ties without comparing keys
+        self.expiry_heap: List[Tuple[float, int, Any, CacheEntry]] = []
+        self.seq = itertools.count()
+    
+    def purge_expired(self, now: float) -> None:
+        """Drop entries whose deadline has passed. Caller holds the lock.
+        
+        Heap items whose entry was since replaced or removed are skipped.
+        """
+        heap = self.expiry_heap
+        cache = self.cache
+        while heap and heap[0][0] <= now:
+            _, _, key, entry = heapq.heappop(heap)
+            if cache.get(key) is entry:
+                del cache[key]
+        
+        # Rebuild when stale items (overwritten or deleted keys) dominate
+        if len(heap) > 2 * len(cache) + 64:
+            self.expiry_heap = [item for item in heap if cache.get(item[2]) is item[3]]
+            heapq.heapify(self.expiry_heap)
+
+
 class LRUCache:
-    """Thread-safe LRU Cache with TTL support"""
+    """Thread-safe LRU Cache with TTL support
+    
+    Keys are spread over `num_stripes` segments, each with its own lock and
+    LRU order, so threads touching different keys do not contend. With more
+    than one stripe, eviction is LRU within a stripe rather than globally.
+    """
     
-    def __init__(self, max_size: int = 1000, ttl: Optional[int] = 3600):
+    def __init__(self, max_size: int = 1000, ttl: Optional[int] = 3600,
+                 num_stripes: int = 1):
         """
         Initialize LRU Cache
         
         Args:
             max_size: Maximum number of items in cache
             ttl: Time-to-live for entries in seconds
+            num_stripes: Number of independently locked segments; the size
+                budget is split evenly between them
         """
         self.max_size = max_size
         self.ttl = ttl
-        self.cache: OrderedDict = OrderedDict()
-        self.lock = Lock()
-        self.hits = 0
-        self.misses = 0
+        self.num_stripes = num_stripes
+        stripe_size = max(1, max_size // num_stripes)
+        self._stripes = [_CacheStripe(stripe_size) for _ in range(num_stripes)]
         
-        logger.info(f"LRU Cache initialized: max_size={max_size}, ttl={ttl}")
+        logger.info(
+            f"LRU Cache initialized: max_size={max_size}, ttl={ttl}, "
+            f"stripes={num_stripes}"
+        )
+    
+    def _stripe(self, key: str) -> _CacheStripe:
+        """Select the stripe that owns a key"""
+        if self.num_stripes == 1:
+            return self._stripes[0]
+        return self._stripes[hash(key) % self.num_stripes]
+    
+    @property
+    def hits(self) -> int:
+        return sum(stripe.hits for stripe in self._stripes)
+    
+    @property
+    def misses(self) -> int:
+        return sum(stripe.misses for stripe in self._stripes)
+    
+    def __len__(self) -> int:
+        return sum(len(stripe.cache) for stripe in self._stripes)
     
     def get(self, key: str) -> Optional[Any]:
         """Get value from cache"""
-        with self.lock:
-            if key not in self.cache:
-                self.misses += 1
+        stripe = self._stripe(key)
+        with stripe.lock:
+            entry = stripe.cache.get(key)
+            if entry is None:
+                stripe.misses += 1
                 return None
             
-            entry = self.cache[key]
-            
-            # Check if expired
-            if entry.is_expired():
-                del self.cache[key]
-                self.misses += 1
+            now = time.monotonic()
+            if entry.is_expired(now):
+                del stripe.cache[key]
+                stripe.misses += 1
                 logger.debug(f"Cache entry {key} expired")
                 return None
             
             # Move to end (most recently used)
-            self.cache.move_to_end(key)
-            self.hits += 1
-            return entry.access()
+            stripe.cache.move_to_end(key)
+            stripe.hits += 1
+            entry.access_count += 1
+            entry.last_accessed = now
+            return entry.value
     
     def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
         """Set value in cache"""
-        with self.lock:
-            ttl = ttl or self.ttl
-            
-            # Remove if already exists (will be re-added at end)
-            if key in self.cache:
-                del self.cache[key]
+        stripe = self._stripe(key)
+        with stripe.lock:
+            cache = stripe.cache
+            entry = CacheEntry(value, ttl or self.ttl)
+            if entry.expire_at is not None:
+                heapq.heappush(
+                    stripe.expiry_heap,
+                    (entry.expire_at, next(stripe.seq), key, entry)
+                )
+            stripe.purge_expired(entry.last_accessed)
             
-            # Add new entry
-            self.cache[key] = CacheEntry(value, ttl)
+            cache[key] = entry
+            cache.move_to_end(key)
             
             # Evict LRU if needed
-            if len(self.cache) > self.max_size:
-                oldest = next(iter(self.cache))
-                del self.cache[oldest]
-                logger.debug(f"Evicted LRU key: {oldest}")
-            
-            logger.debug(f"Cached {key} (size={len(self.cache)})")
+            if len(cache) > stripe.max_size:
+                cache.popitem(last=False)
+    
+    def delete(self, key: str) -> bool:
+        """Remove a key from the cache
+        
+        Returns:
+            True if the key was present
+        """
+        stripe = self._stripe(key)
+        with stripe.lock:
+            return stripe.cache.pop(key, None) is not None
     
     def clear(self) -> None:
         """Clear all cache entries"""
-        with self.lock:
-            self.cache.clear()
-            logger.info("Cache cleared")
+        for stripe in self._stripes:
+            with stripe.lock:
+                stripe.cache.clear()
+                stripe.expiry_heap.clear()
+        logger.info("Cache cleared")
     
     def get_stats(self) -> Dict:
         """Get cache statistics"""
-        with self.lock:
-            total = self.hits + self.misses
-            hit_rate = (self.hits / total * 100) if total > 0 else 0
-            return {
-                'size': len(self.cache),
-                'max_size': self.max_size,
-                'hits': self.hits,
-                'misses': self.misses,
-                'hit_rate': f"{hit_rate:.2f}%",
-                'utilization': f"{len(self.cache) / self.max_size * 100:.2f}%"
-            }
+        hits = self.hits
+        misses = self.misses
+        size = len(self)
+        total = hits + misses
+        hit_rate = (hits / total * 100) if total > 0 else 0
+        return {
+            'size': size,
+            'max_size': self.max_size,
+            'stripes': self.num_stripes,
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': f"{hit_rate:.2f}%",
+            'utilization': f"{size / self.max_size * 100:.2f}%"
+        }
 
 
 class CacheManager:
@@ -133,22 +216,31 @@ class CacheManager:
     
     def __init__(self, cache_dir: str = "./cache", max_size: int = 1000):
         self.cache_dir = cache_dir
-        self.memory_cache = LRUCache(max_size=max_size)
+        self.memory_cache = LRUCache(max_size=max_size, num_stripes=16)
         os.makedirs(cache_dir, exist_ok=True)
         logger.info(f"Cache Manager initialized: dir={cache_dir}")
     
     @staticmethod
     def _hash_key(key: str) -> str:
         """Hash key for safe filesystem storage"""
-        return hashlib.md5(key.encode()).hexdigest()
+        data = key.encode() if isinstance(key, str) else key
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
     
     def cached(self, ttl: Optional[int] = None):
         """Decorator for caching function results"""
         def decorator(func: Callable):
             @wraps(func)
             def wrapper(*args, **kwargs):
-                # Generate cache key
-                key = f"{func.__name__}_{args}_{kwargs}"
+                # Generate cache key from the pickled call signature;
+                # calls with unpicklable arguments are not cached
+                try:
+                    key = CacheManager._hash_key(pickle.dumps(
+                        (func.__module__, func.__qualname__, args,
+                         tuple(sorted(kwargs.items()))),
+                        protocol=5
+                    ))
+                except (pickle.PicklingError, TypeError, AttributeError):
+                    return func(*args, **kwargs)
                 
                 # Try memory cache first
                 cached_value = self.memory_cache.get(key)
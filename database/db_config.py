@@ -7,19 +7,65 @@ Security: All database credentials are loaded from environment variables.
 """
 
 import os
-from typing import Generator, Optional
-from contextlib import contextmanager
+import time
+from contextvars import ContextVar
+from typing import AsyncGenerator, Generator, Iterator, List, Optional
+from contextlib import asynccontextmanager, contextmanager
 import logging
 
 from sqlalchemy import create_engine, event, pool, text
-from sqlalchemy.orm import sessionmaker, Session, declarative_base
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, sessionmaker, Session
 from sqlalchemy.pool import QueuePool
 from sqlalchemy.exc import SQLAlchemyError, DBAPIError
 
 logger = logging.getLogger(__name__)
 
-# SQLAlchemy ORM Base
-Base = declarative_base()
+
+class Base(DeclarativeBase):
+    """SQLAlchemy ORM base for annotated (Mapped[...]) declarative models."""
+
+
+# Seconds a successful health check is reused
+HEALTH_CHECK_TTL = 5.0
+
+# Count statements per request session (development only)
+COUNT_QUERIES = os.getenv("SQL_COUNT_QUERIES") == "1"
+
+_query_counter: ContextVar[Optional[List[int]]] = ContextVar(
+    "query_counter", default=None
+)
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    """Increment the active query counter, if any."""
+    counter = _query_counter.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+if COUNT_QUERIES:
+    event.listen(Engine, "before_cursor_execute", _count_query)
+
+
+@contextmanager
+def count_queries() -> Iterator[List[int]]:
+    """Count statements executed in the current context.
+
+    Only counts when SQL_COUNT_QUERIES=1 installed the engine listener.
+
+    Usage:
+        with count_queries() as counter:
+            ...
+        logger.debug(f"{counter[0]} queries")
+    """
+    counter = [0]
+    token = _query_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _query_counter.reset(token)
 
 
 class DatabaseConfig:
@@ -32,7 +78,9 @@ class DatabaseConfig:
         max_overflow: int = 20,
         pool_timeout: int = 30,
         pool_recycle: int = 3600,
-        echo: bool = False,
+        echo: Optional[bool] = None,
+        query_cache_size: int = 1200,
+        statement_cache_size: int = 1024,
     ):
         """
         Initialize database configuration.
@@ -43,7 +91,10 @@ class DatabaseConfig:
             max_overflow: Maximum overflow connections
             pool_timeout: Timeout for getting connection from pool (seconds)
             pool_recycle: Recycle connections after N seconds (prevents timeout)
-            echo: Enable SQL query logging
+            echo: Enable SQL query logging (defaults to SQL_ECHO=1)
+            query_cache_size: Entries in SQLAlchemy's compiled SQL cache
+            statement_cache_size: Prepared statements cached per asyncpg
+                connection
         """
         self.db_url = db_url or os.getenv(
             "DATABASE_URL",
@@ -53,7 +104,11 @@ class DatabaseConfig:
         self.max_overflow = max_overflow
         self.pool_timeout = pool_timeout
         self.pool_recycle = pool_recycle
-        self.echo = echo
+        self.echo = os.getenv("SQL_ECHO") == "1" if echo is None else echo
+        self.query_cache_size = query_cache_size
+        self.statement_cache_size = statement_cache_size
+        self.async_db_url = self._async_url(self.db_url)
+        self._last_healthy: Optional[float] = None
 
         # Validate DATABASE_URL format
         if not self._validate_db_url():
@@ -63,7 +118,32 @@ class DatabaseConfig:
 
     def _validate_db_url(self) -> bool:
         """Validate database URL format."""
-        return self.db_url.startswith(("postgresql://", "postgresql+psycopg2://"))
+        return self.db_url.startswith((
+            "postgresql://",
+            "postgresql+psycopg2://",
+            "postgresql+psycopg://",
+            "postgresql+asyncpg://",
+        ))
+
+    @staticmethod
+    def _async_url(db_url: str) -> str:
+        """Derive the asyncpg URL used by the async engine."""
+        url = make_url(db_url)
+        if url.get_backend_name() == "postgresql":
+            url = url.set(drivername="postgresql+asyncpg")
+        return url.render_as_string(hide_password=False)
+
+    def _executemany_options(self) -> dict:
+        """Driver-specific executemany tuning.
+
+        INSERT batches are sent as multi-row VALUES of up to 1000 rows
+        (insertmanyvalues). On psycopg2, other executemany statements, such
+        as the bulk view-count UPDATE, also go through execute_batch.
+        """
+        options = {"insertmanyvalues_page_size": 1000}
+        if make_url(self.db_url).get_driver_name() == "psycopg2":
+            options["executemany_mode"] = "values_plus_batch"
+        return options
 
     def get_engine(self):
         """Create SQLAlchemy engine with connection pooling."""
@@ -75,41 +155,65 @@ class DatabaseConfig:
             pool_timeout=self.pool_timeout,
             pool_recycle=self.pool_recycle,
             echo=self.echo,
-            # Connection pooling options
+            query_cache_size=self.query_cache_size,
+            **self._executemany_options(),
+            # Session timezone is sent in the startup packet, saving a
+            # SET round-trip on every new connection
+            connect_args={"options": "-c timezone=UTC"},
+        )
+
+        logger.info(f"Database engine created with pool_size={self.pool_size}")
+        return engine
+
+    def get_async_engine(self):
+        """Create the asyncpg engine used by async request handlers."""
+        engine = create_async_engine(
+            self.async_db_url,
+            pool_size=self.pool_size,
+            max_overflow=self.max_overflow,
+            pool_timeout=self.pool_timeout,
+            pool_recycle=self.pool_recycle,
+            echo=self.echo,
+            query_cache_size=self.query_cache_size,
             connect_args={
-                "timeout": 30,
-                "check_same_thread": False,
+                "server_settings": {"timezone": "UTC"},
+                # Reuse server-side parse/plan for repeated statements
+                "statement_cache_size": self.statement_cache_size,
+                "prepared_statement_cache_size": self.statement_cache_size,
             },
         )
+        logger.info(f"Async database engine created with pool_size={self.pool_size}")
+        return engine
 
-        # Add event listeners for connection management
-        @event.listens_for(engine, "connect")
-        def receive_connect(dbapi_conn, connection_record):
-            """Execute pragmas on new connections."""
-            cursor = dbapi_conn.cursor()
-            cursor.execute("SET timezone = 'UTC'")
-            cursor.close()
+    async def health_check(self, engine=None) -> bool:
+        """Check database connection health.
 
-        @event.listens_for(engine, "pool_connect")
-        def receive_pool_connect(dbapi_conn, connection_record):
-            """Log pool connection events."""
-            logger.debug("New connection from pool established")
+        A successful check is reused for HEALTH_CHECK_TTL seconds so
+        frequent probes cost one query per window; failures are never
+        cached, so the next probe after an outage queries again.
 
-        logger.info(f"Database engine created with pool_size={self.pool_size}")
-        return engine
+        Args:
+            engine: AsyncEngine to check (defaults to the async session
+                manager's engine)
+        """
+        now = time.monotonic()
+        if self._last_healthy is not None and now - self._last_healthy < HEALTH_CHECK_TTL:
+            return True
 
-    async def health_check(self, engine) -> bool:
-        """Check database connection health."""
+        engine = engine or get_async_session_manager().engine
         try:
-            with engine.connect() as conn:
-                result = conn.execute(text("SELECT 1"))
-                return result.scalar() == 1
+            async with engine.connect() as conn:
+                result = await conn.execute(text("SELECT 1"))
+                healthy = result.scalar() == 1
         except DBAPIError as e:
             logger.error(f"Database health check failed: {str(e)}")
-            return False
+            healthy = False
         except Exception as e:
             logger.error(f"Unexpected error during health check: {str(e)}")
-            return False
+            healthy = False
+
+        self._last_healthy = now if healthy else None
+        return healthy
 
 
 class SessionManager:
@@ -156,9 +260,51 @@ class SessionManager:
         logger.info("Database connections closed")
 
 
+class AsyncSessionManager:
+    """Manages AsyncSession lifecycle on the asyncpg engine."""
+
+    def __init__(self, engine):
+        """Initialize async session manager.
+
+        Args:
+            engine: SQLAlchemy AsyncEngine instance
+        """
+        self.engine = engine
+        self.SessionLocal = async_sessionmaker(
+            engine, autoflush=False, expire_on_commit=False
+        )
+
+    def get_session(self) -> AsyncSession:
+        """Get a new async database session."""
+        return self.SessionLocal()
+
+    @asynccontextmanager
+    async def session_scope(self) -> AsyncGenerator[AsyncSession, None]:
+        """Async context manager for a database transaction.
+
+        Usage:
+            async with session_manager.session_scope() as session:
+                session.add(obj)
+        """
+        async with self.SessionLocal() as session:
+            try:
+                yield session
+                await session.commit()
+            except SQLAlchemyError as e:
+                await session.rollback()
+                logger.error(f"Database transaction failed: {str(e)}")
+                raise
+
+    async def close(self):
+        """Close all connections in the pool."""
+        await self.engine.dispose()
+        logger.info("Async database connections closed")
+
+
 # Global instances (lazy initialized)
 _db_config: Optional[DatabaseConfig] = None
 _session_manager: Optional[SessionManager] = None
+_async_session_manager: Optional[AsyncSessionManager] = None
 
 
 def get_db_config() -> DatabaseConfig:
@@ -190,6 +336,35 @@ def get_session() -> Session:
     return get_session_manager().get_session()
 
 
+def get_async_session_manager() -> AsyncSessionManager:
+    """Get or create async session manager."""
+    global _async_session_manager
+    if _async_session_manager is None:
+        config = get_db_config()
+        engine = config.get_async_engine()
+        _async_session_manager = AsyncSessionManager(engine)
+    return _async_session_manager
+
+
+async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+    """Yield an async database session (FastAPI dependency).
+
+    Usage in FastAPI:
+        @app.get("/items/")
+        async def read_items(session: AsyncSession = Depends(get_async_session)):
+            return (await session.scalars(select(Item))).all()
+    """
+    if not COUNT_QUERIES:
+        async with get_async_session_manager().get_session() as session:
+            yield session
+        return
+
+    with count_queries() as counter:
+        async with get_async_session_manager().get_session() as session:
+            yield session
+    logger.debug(f"Request session executed {counter[0]} queries")
+
+
 def create_all_tables():
     """Create all database tables."""
     config = get_db_config()
@@ -198,6 +373,66 @@ def create_all_tables():
     logger.info("All database tables created")
 
 
+# Tables whose secondary indexes are worth dropping around bulk loads
+HOT_INDEX_TABLES = ("analytics",)
+
+
+def _hot_indexes(tables):
+    """Yield the non-unique secondary indexes of the given tables."""
+    for table_name in tables:
+        for index in Base.metadata.tables[table_name].indexes:
+            if not index.unique:
+                yield index
+
+
+def drop_hot_indexes(engine=None, tables=HOT_INDEX_TABLES):
+    """Drop secondary indexes before a bulk load.
+
+    Maintaining every index row by row during a large import is far more
+    expensive than rebuilding each index once afterwards. Unique indexes
+    are kept so constraints still hold during the load.
+
+    Args:
+        engine: SQLAlchemy engine (defaults to the session manager's engine)
+        tables: Names of the tables whose indexes should be dropped
+    """
+    engine = engine or get_session_manager().engine
+    with engine.begin() as conn:
+        for index in _hot_indexes(tables):
+            index.drop(bind=conn, checkfirst=True)
+            logger.info(f"Dropped index {index.name}")
+
+
+def recreate_hot_indexes(engine=None, tables=HOT_INDEX_TABLES):
+    """Recreate the indexes removed by drop_hot_indexes.
+
+    Args:
+        engine: SQLAlchemy engine (defaults to the session manager's engine)
+        tables: Names of the tables whose indexes should be recreated
+    """
+    engine = engine or get_session_manager().engine
+    with engine.begin() as conn:
+        for index in _hot_indexes(tables):
+            index.create(bind=conn, checkfirst=True)
+            logger.info(f"Recreated index {index.name}")
+
+
+@contextmanager
+def deferred_indexes(engine=None, tables=HOT_INDEX_TABLES):
+    """Context manager that drops hot indexes for the duration of a bulk load.
+
+    Usage:
+        with deferred_indexes():
+            session.execute(insert(Analytics), rows)
+            session.commit()
+    """
+    drop_hot_indexes(engine, tables)
+    try:
+        yield
+    finally:
+        recreate_hot_indexes(engine, tables)
+
+
 def drop_all_tables():
     """Drop all database tables (use with caution!)."""
     config = get_db_config()
@@ -3,37 +3,57 @@
 Defines database tables for content, users, analytics, and system metadata.
 """
 
-from datetime import datetime, timezone
-from typing import Optional
 import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional
 
-from sqlalchemy import Column, String, Text, DateTime, Integer, Boolean, Float, ForeignKey, Index, CheckConstraint
-from sqlalchemy.dialects.postgresql import UUID, JSONB
-from sqlalchemy.orm import relationship
+from sqlalchemy import String, Text, DateTime, Integer, Boolean, Float, ForeignKey, Index, CheckConstraint, func, select, text
+from sqlalchemy.dialects.postgresql import ARRAY, UUID, JSONB
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from pgvector.sqlalchemy import Vector
 
 from database.db_config import Base
 
 
 class User(Base):
-    """User model for authentication and tracking."""
+    """User model for authentication and tracking.
+
+    Collections are lazy="raise": load them explicitly with selectinload()
+    so iterating over users never issues one query per row. email and
+    username have unique lower() indexes; compare with
+    ``func.lower(User.email) == value.lower()`` (or use ``by_login``).
+    """
 
     __tablename__ = "users"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
-    username = Column(String(50), unique=True, nullable=False, index=True)
-    email = Column(String(255), unique=True, nullable=False, index=True)
-    password_hash = Column(String(255), nullable=False)
-    full_name = Column(String(255), nullable=True)
-    is_active = Column(Boolean, default=True, index=True)
-    is_admin = Column(Boolean, default=False)
-    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), index=True)
-    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
-    last_login_at = Column(DateTime(timezone=True), nullable=True)
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
+    username: Mapped[str] = mapped_column(String(50), unique=True, nullable=False, index=True)
+    email: Mapped[str] = mapped_column(String(255), unique=True, nullable=False, index=True)
+    password_hash: Mapped[str] = mapped_column(String(255), nullable=False)
+    full_name: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    is_active: Mapped[Optional[bool]] = mapped_column(Boolean, default=True)
+    is_admin: Mapped[Optional[bool]] = mapped_column(Boolean, default=False)
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), server_default=func.now(), index=True)
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    last_login_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
 
     # Relationships
-    contents = relationship("Content", back_populates="author", cascade="all, delete-orphan")
-    api_keys = relationship("APIKey", back_populates="user", cascade="all, delete-orphan")
-    analytics = relationship("Analytics", back_populates="user", cascade="all, delete-orphan")
+    contents: Mapped[List["Content"]] = relationship("Content", back_populates="author", cascade="all, delete-orphan", lazy="raise")
+    api_keys: Mapped[List["APIKey"]] = relationship("APIKey", back_populates="user", cascade="all, delete-orphan", lazy="raise")
+    analytics: Mapped[List["Analytics"]] = relationship("Analytics", back_populates="user", cascade="all, delete-orphan", lazy="raise")
+
+    __table_args__ = (
+        # Case-insensitive login lookups; see by_login
+        Index("ix_users_email_lower", func.lower(email), unique=True),
+        Index("ix_users_username_lower", func.lower(username), unique=True),
+    )
+
+    @classmethod
+    def by_login(cls, login: str):
+        """Select the user whose email or username matches login, ignoring case."""
+        login = login.lower()
+        column = cls.email if "@" in login else cls.username
+        return select(cls).where(func.lower(column) == login)
 
     def __repr__(self) -> str:
         return f"<User(id={self.id}, username={self.username}, email={self.email})>"
@@ -44,68 +64,96 @@ class APIKey(Base):
 
     __tablename__ = "api_keys"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
-    key_hash = Column(String(255), unique=True, nullable=False, index=True)
-    name = Column(String(100), nullable=False)
-    is_active = Column(Boolean, default=True, index=True)
-    rate_limit = Column(Integer, default=1000, doc="Requests per minute")
-    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
-    last_used_at = Column(DateTime(timezone=True), nullable=True)
-    expires_at = Column(DateTime(timezone=True), nullable=True, index=True)
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
+    key_hash: Mapped[str] = mapped_column(String(255), unique=True, nullable=False, index=True)
+    name: Mapped[str] = mapped_column(String(100), nullable=False)
+    is_active: Mapped[Optional[bool]] = mapped_column(Boolean, default=True)
+    rate_limit: Mapped[Optional[int]] = mapped_column(Integer, default=1000, doc="Requests per minute")
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    last_used_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    expires_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True, index=True)
 
     # Relationships
-    user = relationship("User", back_populates="api_keys")
+    user: Mapped["User"] = relationship("User", back_populates="api_keys")
+
+    __table_args__ = (
+        # Key lookups only ever consider active keys
+        Index(
+            "ix_api_keys_active_expires",
+            "expires_at",
+            postgresql_where=text("is_active = true"),
+        ),
+    )
 
     def __repr__(self) -> str:
         return f"<APIKey(id={self.id}, user_id={self.user_id}, name={self.name})>"
 
 
 class Content(Base):
-    """Generated content model."""
+    """Generated content model.
+
+    metadata_json has a GIN (jsonb_path_ops) index, which only serves
+    containment: filter with ``Content.metadata_json.contains({...})``
+    (``@>``), not ``->>`` comparisons. tags is GIN indexed as well; use
+    ``Content.tags.overlap([...])`` (``&&``) or ``.contains([...])``.
+    """
 
     __tablename__ = "content"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
-    title = Column(String(500), nullable=False, index=True)
-    body = Column(Text, nullable=False)
-    style = Column(String(50), nullable=False, index=True, comment="e.g., satirical, witty, sharp")
-    language = Column(String(10), default="ru", index=True)
-    status = Column(String(20), default="draft", index=True, comment="draft, published, archived")
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
+    title: Mapped[str] = mapped_column(String(500), nullable=False, index=True)
+    body: Mapped[str] = mapped_column(Text, nullable=False)
+    style: Mapped[str] = mapped_column(String(50), nullable=False, index=True, comment="e.g., satirical, witty, sharp")
+    language: Mapped[Optional[str]] = mapped_column(String(10), default="ru", index=True)
+    status: Mapped[Optional[str]] = mapped_column(String(20), default="draft", index=True, comment="draft, published, archived")
     
     # Generation metadata
-    prompt = Column(Text, nullable=True)
-    model_used = Column(String(100), nullable=False, comment="e.g., pplx-70b-online")
-    tokens_used = Column(Integer, nullable=True)
-    generation_time_ms = Column(Integer, nullable=True)
+    prompt: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    model_used: Mapped[str] = mapped_column(String(100), nullable=False, comment="e.g., pplx-70b-online")
+    tokens_used: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    generation_time_ms: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     
     # Content metrics
-    views = Column(Integer, default=0)
-    likes = Column(Integer, default=0)
-    shares = Column(Integer, default=0)
-    comments_count = Column(Integer, default=0)
+    views: Mapped[Optional[int]] = mapped_column(Integer, default=0)
+    likes: Mapped[Optional[int]] = mapped_column(Integer, default=0)
+    shares: Mapped[Optional[int]] = mapped_column(Integer, default=0)
+    comments_count: Mapped[Optional[int]] = mapped_column(Integer, default=0)
     
     # URLs and social media
-    medium_url = Column(String(500), nullable=True, unique=True, index=True)
-    telegram_post_id = Column(String(100), nullable=True, unique=True)
-    twitter_url = Column(String(500), nullable=True, unique=True)
+    medium_url: Mapped[Optional[str]] = mapped_column(String(500), nullable=True, unique=True, index=True)
+    telegram_post_id: Mapped[Optional[str]] = mapped_column(String(100), nullable=True, unique=True)
+    twitter_url: Mapped[Optional[str]] = mapped_column(String(500), nullable=True, unique=True)
     
-    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), index=True)
-    published_at = Column(DateTime(timezone=True), nullable=True, index=True)
-    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), server_default=func.now(), index=True)
+    published_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True, index=True)
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
     # Additional metadata
-    metadata_json = Column(JSONB, nullable=True, comment="Additional JSON metadata")
-    tags = Column(String(500), nullable=True, comment="Comma-separated tags")
+    metadata_json: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSONB, nullable=True, comment="Additional JSON metadata")
+    tags: Mapped[Optional[List[str]]] = mapped_column(ARRAY(Text), nullable=True, comment="Tag list; filter with overlap()/contains()")
 
     # Relationships
-    author = relationship("User", back_populates="contents")
-    analytics = relationship("Analytics", back_populates="content", cascade="all, delete-orphan")
+    author: Mapped["User"] = relationship("User", back_populates="contents")
+    analytics: Mapped[List["Analytics"]] = relationship("Analytics", back_populates="content", cascade="all, delete-orphan", lazy="raise")
 
     __table_args__ = (
         Index("ix_content_user_created", "user_id", "created_at"),
-        Index("ix_content_status_published", "status", "published_at"),
+        # Published listings only; drafts and archived rows stay out of it
+        Index(
+            "ix_content_published_time",
+            "published_at",
+            postgresql_where=text("status = 'published'"),
+        ),
+        Index("ix_content_status_created_at", "status", created_at.desc(), id.desc()),
+        Index(
+            "ix_content_metadata_gin",
+            "metadata_json",
+            postgresql_using="gin",
+            postgresql_ops={"metadata_json": "jsonb_path_ops"},
+        ),
+        Index("ix_content_tags_gin", "tags", postgresql_using="gin"),
         CheckConstraint("status IN ('draft', 'published', 'archived')"),
     )
 
@@ -114,40 +162,58 @@ class Content(Base):
 
 
 class Analytics(Base):
-    """Analytics and usage tracking."""
+    """Analytics and usage tracking.
+
+    metadata_json has a GIN (jsonb_path_ops) index; query it with
+    ``Analytics.metadata_json.contains({...})`` so the index is used.
+    """
 
     __tablename__ = "analytics"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True, index=True)
-    content_id = Column(UUID(as_uuid=True), ForeignKey("content.id"), nullable=True, index=True)
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
+    user_id: Mapped[Optional[uuid.UUID]] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True, index=True)
+    content_id: Mapped[Optional[uuid.UUID]] = mapped_column(UUID(as_uuid=True), ForeignKey("content.id"), nullable=True, index=True)
     
-    event_type = Column(String(50), nullable=False, index=True, comment="e.g., view, generate, publish, error")
-    event_category = Column(String(50), nullable=False, index=True, comment="e.g., content, api, system")
+    event_type: Mapped[str] = mapped_column(String(50), nullable=False, index=True, comment="e.g., view, generate, publish, error")
+    event_category: Mapped[str] = mapped_column(String(50), nullable=False, index=True, comment="e.g., content, api, system")
     
     # Request/Response details
-    endpoint = Column(String(255), nullable=True, comment="API endpoint called")
-    method = Column(String(20), nullable=True, comment="HTTP method")
-    status_code = Column(Integer, nullable=True, index=True)
-    response_time_ms = Column(Integer, nullable=True)
-    error_message = Column(Text, nullable=True)
+    endpoint: Mapped[Optional[str]] = mapped_column(String(255), nullable=True, comment="API endpoint called")
+    method: Mapped[Optional[str]] = mapped_column(String(20), nullable=True, comment="HTTP method")
+    status_code: Mapped[Optional[int]] = mapped_column(Integer, nullable=True, index=True)
+    response_time_ms: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    error_message: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     
     # Request metadata
-    user_agent = Column(String(500), nullable=True)
-    ip_address = Column(String(45), nullable=True)  # IPv4 and IPv6
-    request_id = Column(String(100), unique=True, nullable=True, index=True)
+    user_agent: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
+    ip_address: Mapped[Optional[str]] = mapped_column(String(45), nullable=True)  # IPv4 and IPv6
+    request_id: Mapped[Optional[str]] = mapped_column(String(100), unique=True, nullable=True, index=True)
     
     # Additional context
-    metadata_json = Column(JSONB, nullable=True)
-    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), index=True)
+    metadata_json: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSONB, nullable=True)
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
-    user = relationship("User", back_populates="analytics")
-    content = relationship("Content", back_populates="analytics")
+    user: Mapped[Optional["User"]] = relationship("User", back_populates="analytics")
+    content: Mapped[Optional["Content"]] = relationship("Content", back_populates="analytics")
 
     __table_args__ = (
         Index("ix_analytics_user_created", "user_id", "created_at"),
         Index("ix_analytics_event_created", "event_type", "created_at"),
+        Index("ix_analytics_endpoint_created", "endpoint", created_at.desc()),
+        Index(
+            "ix_analytics_metadata_gin",
+            "metadata_json",
+            postgresql_using="gin",
+            postgresql_ops={"metadata_json": "jsonb_path_ops"},
+        ),
+        # Rows are append-only, so a BRIN index covers time-range scans
+        Index(
+            "ix_analytics_created_brin",
+            "created_at",
+            postgresql_using="brin",
+            postgresql_with={"pages_per_range": 32},
+        ),
     )
 
     def __repr__(self) -> str:
@@ -159,39 +225,64 @@ class SystemMetadata(Base):
 
     __tablename__ = "system_metadata"
 
-    key = Column(String(100), primary_key=True, index=True)
-    value = Column(Text, nullable=False)
-    value_type = Column(String(20), default="string", comment="string, integer, boolean, json")
-    description = Column(String(500), nullable=True)
-    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+    key: Mapped[str] = mapped_column(String(100), primary_key=True)
+    value: Mapped[str] = mapped_column(Text, nullable=False)
+    value_type: Mapped[Optional[str]] = mapped_column(String(20), default="string", comment="string, integer, boolean, json")
+    description: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     def __repr__(self) -> str:
         return f"<SystemMetadata(key={self.key}, value={self.value[:50]})>"
 
 
+# Output size of the default sentence-transformers/paraphrase-MiniLM-L6-v2 model
+EMBEDDING_DIMENSION = 384
+
+
 class RAGVector(Base):
-    """Store RAG vectors for semantic search."""
+    """Store RAG vectors for semantic search.
+
+    embedding is a pgvector column with an HNSW cosine index, so nearest
+    neighbour search runs in the database (see ``nearest``).
+    """
 
     __tablename__ = "rag_vectors"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
-    content_id = Column(UUID(as_uuid=True), ForeignKey("content.id"), nullable=True, index=True)
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
+    content_id: Mapped[Optional[uuid.UUID]] = mapped_column(UUID(as_uuid=True), ForeignKey("content.id"), nullable=True, index=True)
     
     # Vector data (for embedding storage)
-    vector_text = Column(Text, nullable=False, comment="Original text for embedding")
-    embedding_model = Column(String(100), nullable=False, comment="e.g., sentence-transformers/multilingual-MiniLM")
+    vector_text: Mapped[str] = mapped_column(Text, nullable=False, comment="Original text for embedding")
+    embedding_model: Mapped[str] = mapped_column(String(100), nullable=False, comment="e.g., sentence-transformers/multilingual-MiniLM")
     
     # Vector metadata
-    chunk_index = Column(Integer, nullable=False, comment="Position in original document")
-    vector_dimension = Column(Integer, nullable=False, comment="Embedding dimension")
+    chunk_index: Mapped[int] = mapped_column(Integer, nullable=False, comment="Position in original document")
+    vector_dimension: Mapped[int] = mapped_column(Integer, nullable=False, comment="Embedding dimension")
+    embedding: Mapped[Optional[Any]] = mapped_column(Vector(EMBEDDING_DIMENSION), nullable=True)
     
     # Storage and timestamps
-    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), index=True)
-    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), server_default=func.now(), index=True)
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     __table_args__ = (
         Index("ix_rag_vectors_content_chunk", "content_id", "chunk_index"),
+        Index(
+            "ix_rag_vectors_embedding_hnsw",
+            "embedding",
+            postgresql_using="hnsw",
+            postgresql_ops={"embedding": "vector_cosine_ops"},
+            postgresql_with={"m": 16, "ef_construction": 64},
+        ),
     )
 
+    @classmethod
+    def nearest(cls, query_embedding, k: int = 5):
+        """Select the k vectors closest to query_embedding by cosine distance."""
+        return (
+            select(cls)
+            .order_by(cls.embedding.cosine_distance(query_embedding))
+            .limit(k)
+        )
+
     def __repr__(self) -> str:
         return f"<RAGVector(id={self.id}, content_id={self.content_id}, chunk_index={self.chunk_index})>"
@@ -5,9 +5,10 @@ for production-ready error handling.
 """
 
 import logging
+import time
 import traceback
 from typing import Dict, Any, Optional, Callable
-from datetime import datetime
+from datetime import datetime, timezone
 from functools import wraps
 import json
 
@@ -24,9 +25,14 @@ class APIException(Exception):
         self.status_code = status_code
         self.error_code = error_code
         self.details = details or {}
-        self.timestamp = datetime.utcnow().isoformat()
+        self.timestamp_ns = time.time_ns()
         super().__init__(self.message)
 
+    @property
+    def timestamp(self) -> str:
+        """ISO 8601 UTC time the exception was raised, formatted on demand."""
+        return datetime.fromtimestamp(self.timestamp_ns / 1e9, tz=timezone.utc).isoformat()
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert exception to dict for JSON response."""
         return {
@@ -121,7 +127,7 @@ class ExceptionHandler:
                 "code": "INTERNAL_ERROR",
                 "message": "An unexpected error occurred",
                 "status_code": 500,
-                "timestamp": datetime.utcnow().isoformat(),
+                "timestamp": datetime.now(timezone.utc).isoformat(),
                 "request_id": request_id
             }
         }
@@ -8,7 +8,8 @@ Usage:
     python jwt_generator.py --length 64
 """
 
-import secrets
+import os
+import base64
 import argparse
 from datetime import datetime
 
@@ -23,7 +24,7 @@ def generate_jwt_secret(length: int = 32) -> str:
     Returns:
         URL-safe base64 encoded secret key
     """
-    return secrets.token_urlsafe(length)
+    return base64.urlsafe_b64encode(os.urandom(length)).rstrip(b"=").decode("ascii")
 
 
 def main():
@@ -44,6 +45,8 @@ def main():
     )
     
     args = parser.parse_args()
+    if args.count < 1:
+        parser.error("--count must be at least 1")
     
     print("\n" + "="*70)
     print("JWT SECRET KEY GENERATOR - Faberlic Satire RAG")
@@ -65,7 +68,7 @@ def main():
     print("  4. Never commit .env files to Git")
     print("  5. Rotate keys periodically (every 90 days recommended)\n")
     print("  📤 Use in .env file:")
-    print(f"     JWT_SECRET_KEY={generate_jwt_secret(args.length)}\n")
+    print(f"     JWT_SECRET_KEY={secret}\n")
     print("="*70 + "\n")
 
 
@@ -10,15 +10,19 @@ Supports:
 """
 
 import time
-import json
+import itertools
 import logging
+import threading
 from typing import Dict, Any, Optional, Callable
-from dataclasses import dataclass, asdict
-from datetime import datetime, timedelta
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
 from enum import Enum
 from threading import Lock
 from functools import wraps
 
+import orjson
+
 
 class MetricLevel(Enum):
     """Metric severity levels"""
@@ -28,69 +32,135 @@ class MetricLevel(Enum):
     CRITICAL = "critical"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Metric:
     """Represents a single metric event"""
     name: str
     value: float
     unit: str = "ms"
     level: MetricLevel = MetricLevel.INFO
-    timestamp: str = None
-    tags: Dict[str, str] = None
+    timestamp_ns: int = field(default_factory=time.time_ns)
+    tags: Dict[str, str] = field(default_factory=dict)
     
-    def __post_init__(self):
-        if self.timestamp is None:
-            self.timestamp = datetime.utcnow().isoformat()
-        if self.tags is None:
-            self.tags = {}
+    @property
+    def timestamp(self) -> str:
+        """ISO 8601 UTC timestamp, formatted on demand"""
+        return datetime.fromtimestamp(self.timestamp_ns / 1e9, tz=timezone.utc).isoformat()
     
     def to_json(self) -> str:
         """Convert to JSON format"""
-        data = asdict(self)
-        data['level'] = self.level.value
-        return json.dumps(data)
+        return orjson.dumps({
+            'name': self.name,
+            'value': self.value,
+            'unit': self.unit,
+            'level': self.level.value,
+            'timestamp': self.timestamp,
+            'tags': self.tags,
+        }).decode()
 
 
-class MetricsCollector:
-    """Collects and aggregates metrics"""
+# Independent stat shards in a MetricsCollector; threads map onto shards by
+# a per-thread index, so concurrent recorders rarely share a lock
+N_SHARDS = 16
+
+# Thread idents are page-aligned addresses on Linux, so ident % n would put
+# every thread in shard 0; number threads in order of first use instead
+_thread_slot = threading.local()
+_thread_numbers = itertools.count()
+
+
+def _thread_index() -> int:
+    """Stable, sequentially assigned index of the calling thread"""
+    try:
+        return _thread_slot.index
+    except AttributeError:
+        _thread_slot.index = index = next(_thread_numbers)
+        return index
+
+
+class _MetricShard:
+    """Running aggregates for the threads that hash to one shard"""
+    
+    __slots__ = ('lock', 'stats')
     
     def __init__(self):
-        self.metrics: Dict[str, list] = {}
         self.lock = Lock()
+        self.stats: Dict[str, list] = {}
+
+
+class MetricsCollector:
+    """Collects and aggregates metrics
+    
+    Keeps running count/sum/min/max/last per metric name rather than
+    every event, so memory is bounded by the number of names. Stats are
+    split across shards picked per thread; get_stats merges them.
+    """
+    
+    def __init__(self, num_shards: int = N_SHARDS):
+        self._shards = [_MetricShard() for _ in range(num_shards)]
+        # next() on itertools.count is atomic, ordering "last" across shards
+        self._seq = itertools.count()
         self.logger = logging.getLogger(__name__)
     
     def record(self, metric: Metric) -> None:
         """Record a metric"""
-        with self.lock:
-            if metric.name not in self.metrics:
-                self.metrics[metric.name] = []
-            self.metrics[metric.name].append(metric)
-            
-            # Log the metric
+        value = metric.value
+        seq = next(self._seq)
+        shard = self._shards[_thread_index() % len(self._shards)]
+        with shard.lock:
+            stats = shard.stats.get(metric.name)
+            if stats is None:
+                # [count, sum, min, max, last, seq of last]
+                shard.stats[metric.name] = [1, value, value, value, value, seq]
+            else:
+                stats[0] += 1
+                stats[1] += value
+                if value < stats[2]:
+                    stats[2] = value
+                if value > stats[3]:
+                    stats[3] = value
+                if seq > stats[5]:
+                    stats[4] = value
+                    stats[5] = seq
+        
+        # Log the metric; skip serializing it when INFO is filtered out
+        if self.logger.isEnabledFor(logging.INFO):
             self.logger.info(f"Metric: {metric.to_json()}")
     
     def get_stats(self, metric_name: str) -> Optional[Dict]:
         """Get statistics for a metric"""
-        with self.lock:
-            if metric_name not in self.metrics:
-                return None
-            
-            values = [m.value for m in self.metrics[metric_name]]
-            if not values:
-                return None
-            
-            return {
-                'count': len(values),
-                'min': min(values),
-                'max': max(values),
-                'avg': sum(values) / len(values),
-                'last': values[-1]
-            }
+        merged = None
+        for shard in self._shards:
+            with shard.lock:
+                stats = shard.stats.get(metric_name)
+                if stats is None:
+                    continue
+                if merged is None:
+                    merged = list(stats)
+                    continue
+                merged[0] += stats[0]
+                merged[1] += stats[1]
+                merged[2] = min(merged[2], stats[2])
+                merged[3] = max(merged[3], stats[3])
+                if stats[5] > merged[5]:
+                    merged[4], merged[5] = stats[4], stats[5]
+        
+        if merged is None:
+            return None
+        
+        return {
+            'count': merged[0],
+            'min': merged[2],
+            'max': merged[3],
+            'avg': merged[1] / merged[0],
+            'last': merged[4]
+        }
     
     def clear(self) -> None:
         """Clear all metrics"""
-        with self.lock:
-            self.metrics.clear()
+        for shard in self._shards:
+            with shard.lock:
+                shard.stats.clear()
 
 
 class PerformanceMonitor:
@@ -105,12 +175,12 @@ class PerformanceMonitor:
         def decorator(func: Callable):
             @wraps(func)
             def wrapper(*args, **kwargs):
-                start_time = time.time()
+                start = time.perf_counter_ns()
                 try:
                     result = func(*args, **kwargs)
                     return result
                 finally:
-                    elapsed_ms = (time.time() - start_time) * 1000
+                    elapsed_ms = (time.perf_counter_ns() - start) / 1_000_000
                     
                     # Determine level
                     level = MetricLevel.INFO
@@ -161,42 +231,60 @@ class HealthCheck:
         return all(self.run_checks().values())
 
 
+# Longest window get_error_rate can answer, in seconds
+ERROR_WINDOW_SECONDS = 3600
+
+
 class ErrorTracker:
-    """Tracks errors and exceptions"""
+    """Tracks errors and exceptions
     
-    def __init__(self):
-        self.errors: Dict[str, list] = {}
+    Counts errors per type in one-second buckets, so memory is bounded
+    by the window and rates are computed without parsing timestamps.
+    Error details go to the log.
+    """
+    
+    def __init__(self, window_seconds: int = ERROR_WINDOW_SECONDS):
+        self.buckets: Dict[str, deque] = {}
+        self.window_seconds = window_seconds
         self.lock = Lock()
         self.logger = logging.getLogger(__name__)
     
     def record_error(self, error_type: str, message: str, **context) -> None:
         """Record an error"""
+        now = int(time.time())
         with self.lock:
-            if error_type not in self.errors:
-                self.errors[error_type] = []
-            
-            error_data = {
-                'timestamp': datetime.utcnow().isoformat(),
-                'message': message,
-                'context': context
-            }
-            self.errors[error_type].append(error_data)
-            
-            self.logger.error(f"{error_type}: {message}", extra=context)
+            buckets = self.buckets.get(error_type)
+            if buckets is None:
+                buckets = self.buckets[error_type] = deque(maxlen=self.window_seconds)
+            # [epoch_second, count]
+            if buckets and buckets[-1][0] == now:
+                buckets[-1][1] += 1
+            else:
+                buckets.append([now, 1])
+        
+        self.logger.error(f"{error_type}: {message}", extra=context)
     
     def get_error_rate(self, error_type: str, minutes: int = 5) -> float:
-        """Get error rate for a type"""
+        """Get error rate (errors per second) for a type
+        
+        Windows longer than window_seconds only see the most recent
+        window_seconds of errors.
+        """
+        if not minutes:
+            return 0.0
+        
+        cutoff = int(time.time()) - minutes * 60
+        count = 0
         with self.lock:
-            if error_type not in self.errors:
+            buckets = self.buckets.get(error_type)
+            if not buckets:
                 return 0.0
-            
-            cutoff = datetime.utcnow() - timedelta(minutes=minutes)
-            recent_errors = [
-                e for e in self.errors[error_type]
-                if datetime.fromisoformat(e['timestamp']) > cutoff
-            ]
-            
-            return len(recent_errors) / (minutes * 60) if minutes else 0.0
+            for second, n in reversed(buckets):
+                if second <= cutoff:
+                    break
+                count += n
+        
+        return count / (minutes * 60)
 
 
 # Global monitoring instances
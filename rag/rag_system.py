@@ -11,12 +11,14 @@ Supports:
 import os
 import json
 import logging
-from typing import List, Dict, Tuple, Optional
+from typing import Iterator, List, Dict, MutableMapping, Tuple, Optional
 from dataclasses import dataclass
 from datetime import datetime
 import pickle
 import numpy as np
 
+from caching.cache_manager import LRUCache
+
 try:
     import faiss
     HAS_FAISS = True
@@ -31,6 +33,71 @@ except ImportError:
     HAS_TRANSFORMERS = False
     logging.warning("sentence-transformers not installed.")
 
+try:
+    import pyarrow as pa
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+# Texts per forward pass when encoding documents
+ENCODE_BATCH_SIZE = 64
+
+# OpenMP threads FAISS uses to split a batch search across queries; a
+# single-query search runs on one thread regardless
+FAISS_NUM_THREADS = int(os.getenv("FAISS_NUM_THREADS", "0")) or os.cpu_count() or 1
+
+# Query embeddings kept per RAGSystem, so repeated queries skip the encoder
+QUERY_CACHE_SIZE = 4096
+
+# SentenceTransformer inference backends; ONNX Runtime fuses the graph and
+# is the fastest of the two on CPU
+BACKENDS = ("onnx", "torch")
+
+# Supported FAISS index layouts: exact search, HNSW graph, IVF + product quantization
+INDEX_TYPES = ("flat", "hnsw", "ivfpq")
+
+# HNSW graph parameters
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 40
+HNSW_EF_SEARCH = 16
+
+# IVF lists scanned per query; with the default of 1 a query only sees the
+# vectors in its nearest list and small indexes return fewer than k results
+IVF_NPROBE = 16
+
+# IVF-PQ layout; training needs at least as many vectors as IVF lists
+IVFPQ_FACTORY = "IVF256,PQ32"
+
+# Vectors needed to train ivfpq and pq indexes: 256 IVF lists and 256
+# centroids per 8-bit product sub-quantizer
+MIN_TRAINING_VECTORS = 256
+
+# Vector storage for flat and HNSW indexes: full float32, float16 (half the
+# bytes per vector), int8 with per-dimension ranges (a quarter) or 32-byte
+# product codes (flat only); int8 and pq need training
+QUANTIZATIONS = ("none", "fp16", "int8", "pq")
+
+# int8 ranges are calibrated per dimension from the first batch when it is
+# at least this large; smaller batches use [-1, 1], which bounds every
+# component of a normalized embedding
+INT8_CALIBRATION_MIN = 256
+
+# Saved indexes are memory-mapped read-only; vectors added afterwards go
+# to an exact in-memory delta index and are appended to a journal on
+# save. save() rewrites the full index once this many are journaled.
+COMPACT_THRESHOLD = 10000
+
+# faiss.index_factory descriptions per (index_type, quantization)
+INDEX_FACTORIES = {
+    ("flat", "none"): "Flat",
+    ("flat", "fp16"): "SQfp16",
+    ("flat", "int8"): "SQ8",
+    ("flat", "pq"): "PQ32x8",
+    ("hnsw", "none"): f"HNSW{HNSW_M},Flat",
+    ("hnsw", "fp16"): f"HNSW{HNSW_M},SQfp16",
+    ("hnsw", "int8"): f"HNSW{HNSW_M},SQ8",
+}
+
 # Configure logging
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -60,25 +127,158 @@ class Document:
             self.created_at = datetime.now().isoformat()
 
 
+class DocumentTable(MutableMapping):
+    """Documents stored column-wise
+    
+    Loaded documents stay in a memory-mapped Arrow table; documents added
+    after loading go into parallel Python lists, one per field. Document
+    objects are built only when accessed, so a document is not a separate
+    heap object, and saving reads whole columns. Changes to a returned
+    Document are not kept unless it is assigned back.
+    """
+
+    def __init__(self, table=None):
+        self._table = table
+        self._rows: Dict[str, int] = {}
+        if table is not None:
+            self._rows = {doc_id: row for row, doc_id in enumerate(table.column('id').to_pylist())}
+        # Columns of documents added after loading; _added maps ID to position
+        self._added: Dict[str, int] = {}
+        self._contents: List[str] = []
+        self._metadata: List[Dict] = []
+        self._created_at: List[str] = []
+        self._embeddings: List[Optional[np.ndarray]] = []
+
+    def __getitem__(self, doc_id: str) -> Document:
+        pos = self._added.get(doc_id)
+        if pos is not None:
+            return Document(
+                id=doc_id,
+                content=self._contents[pos],
+                metadata=self._metadata[pos],
+                embedding=self._embeddings[pos],
+                created_at=self._created_at[pos],
+            )
+        row = self._rows[doc_id]
+        metadata = self._table.column('metadata_json')[row].as_py()
+        return Document(
+            id=doc_id,
+            content=self._table.column('content')[row].as_py(),
+            metadata=json.loads(metadata) if metadata else {},
+            created_at=self._table.column('created_at')[row].as_py(),
+        )
+
+    def __setitem__(self, doc_id: str, doc: Document) -> None:
+        pos = self._added.get(doc_id)
+        if pos is None:
+            self._added[doc_id] = len(self._contents)
+            self._contents.append(doc.content)
+            self._metadata.append(doc.metadata)
+            self._created_at.append(doc.created_at)
+            self._embeddings.append(doc.embedding)
+        else:
+            self._contents[pos] = doc.content
+            self._metadata[pos] = doc.metadata
+            self._created_at[pos] = doc.created_at
+            self._embeddings[pos] = doc.embedding
+
+    def __delitem__(self, doc_id: str) -> None:
+        if doc_id not in self:
+            raise KeyError(doc_id)
+        # The column slot is left behind; it is dropped on the next save
+        self._added.pop(doc_id, None)
+        self._rows.pop(doc_id, None)
+
+    def __contains__(self, doc_id) -> bool:
+        return doc_id in self._added or doc_id in self._rows
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._rows
+        for doc_id in self._added:
+            if doc_id not in self._rows:
+                yield doc_id
+
+    def __len__(self) -> int:
+        return len(self._rows) + sum(1 for doc_id in self._added if doc_id not in self._rows)
+
+    def columns(self, doc_ids: List[str]) -> Dict[str, list]:
+        """Content, JSON metadata and created_at columns for the given documents"""
+        table_columns = {}
+        if self._table is not None and any(doc_id not in self._added for doc_id in doc_ids):
+            table_columns = {
+                name: self._table.column(name).to_pylist()
+                for name in ('content', 'metadata_json', 'created_at')
+            }
+        
+        contents, metadata, created_at = [], [], []
+        for doc_id in doc_ids:
+            pos = self._added.get(doc_id)
+            if pos is not None:
+                contents.append(self._contents[pos])
+                metadata.append(json.dumps(self._metadata[pos], ensure_ascii=False))
+                created_at.append(self._created_at[pos])
+            else:
+                row = self._rows[doc_id]
+                contents.append(table_columns['content'][row])
+                metadata.append(table_columns['metadata_json'][row])
+                created_at.append(table_columns['created_at'][row])
+        return {'content': contents, 'metadata_json': metadata, 'created_at': created_at}
+
+
 class RAGSystem:
     """Advanced RAG System with vector database support"""
 
     def __init__(self, model_name: str = "sentence-transformers/paraphrase-MiniLM-L6-v2",
-                 index_dir: str = "./rag_index", dimension: int = 384):
+                 index_dir: str = "./rag_index", dimension: int = 384,
+                 index_type: str = "hnsw", quantization: str = "fp16",
+                 use_gpu: bool = False, backend: str = "onnx"):
         """Initialize RAG System
         
         Args:
             model_name: Sentence transformer model name
             index_dir: Directory to store indices
             dimension: Embedding dimension
+            index_type: "flat" (exact), "hnsw" or "ivfpq"; an index loaded
+                from index_dir keeps the type it was saved with
+            quantization: "none", "fp16", "int8" or "pq" (flat only);
+                ignored for ivfpq, which is always product-quantized
+            use_gpu: Move the index to GPU 0 when FAISS has GPU support;
+                HNSW indexes stay on CPU
+            backend: Embedding inference backend, "onnx" or "torch"; falls
+                back to torch if the ONNX model cannot be loaded
         """
+        if index_type not in INDEX_TYPES:
+            raise ValueError(f"index_type must be one of {INDEX_TYPES}, got {index_type!r}")
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(f"quantization must be one of {QUANTIZATIONS}, got {quantization!r}")
+        if index_type != "ivfpq" and (index_type, quantization) not in INDEX_FACTORIES:
+            raise ValueError(f"quantization {quantization!r} is not supported for {index_type!r} indexes")
+        if backend not in BACKENDS:
+            raise ValueError(f"backend must be one of {BACKENDS}, got {backend!r}")
         self.model_name = model_name
         self.index_dir = index_dir
         self.dimension = dimension
-        self.documents: Dict[str, Document] = {}
+        self.index_type = index_type
+        self.quantization = quantization
+        self.use_gpu = use_gpu
+        self.backend = backend
+        self._on_gpu = False
+        self._gpu_resources = None
+        self.documents: MutableMapping[str, Document] = DocumentTable()
         self.index = None
+        self.delta_index = None  # Vectors added on top of a mapped index
+        self._index_mapped = False
         self.id_mapping = {}  # Maps index to document ID
+        # Documents added since the last save, with whether each is indexed,
+        # and their embeddings
+        self._pending: List[Tuple[Document, bool]] = []
+        self._pending_vectors: List[np.ndarray] = []
+        self._journaled = 0  # Documents in the on-disk journal
+        self._snapshot_ready = False  # index_dir holds a full save to journal onto
         self.model = None
+        self._query_cache = LRUCache(max_size=QUERY_CACHE_SIZE, ttl=None)
+        if HAS_FAISS:
+            faiss.omp_set_num_threads(FAISS_NUM_THREADS)
         self._initialize_model()
         self._load_or_create_index()
         
@@ -90,6 +290,16 @@ class RAGSystem:
             logger.warning("sentence-transformers not available. Install with: pip install sentence-transformers")
             return
         
+        if self.backend == "onnx":
+            try:
+                # Exports the model to ONNX on first use if the repo has no .onnx file
+                self.model = SentenceTransformer(self.model_name, backend="onnx")
+                logger.info(f"Loaded embedding model: {self.model_name} (onnx)")
+                return
+            except Exception as e:
+                logger.warning(f"ONNX backend unavailable, falling back to torch: {e}")
+                self.backend = "torch"
+        
         try:
             self.model = SentenceTransformer(self.model_name)
             logger.info(f"Loaded embedding model: {self.model_name}")
@@ -107,30 +317,292 @@ class RAGSystem:
         index_path = os.path.join(self.index_dir, "faiss.index")
         id_map_path = os.path.join(self.index_dir, "id_mapping.pkl")
         docs_path = os.path.join(self.index_dir, "documents.json")
+        arrow_path = os.path.join(self.index_dir, "docs.arrow")
+        meta_path = os.path.join(self.index_dir, "index_meta.json")
         
         if os.path.exists(index_path):
             try:
-                self.index = faiss.read_index(index_path)
-                with open(id_map_path, 'rb') as f:
-                    self.id_mapping = pickle.load(f)
-                with open(docs_path, 'r') as f:
-                    docs_data = json.load(f)
-                    for doc_id, doc_info in docs_data.items():
-                        self.documents[doc_id] = Document(**doc_info)
+                # Indexes saved before index_meta.json existed are flat float32
+                meta = {}
+                if os.path.exists(meta_path):
+                    with open(meta_path, 'r') as f:
+                        meta = json.load(f)
+                self.index_type = meta.get('index_type', "flat")
+                self.quantization = meta.get('quantization', "none")
+                self.index = self._read_index(index_path)
+                if HAS_PYARROW and os.path.exists(arrow_path):
+                    self._load_arrow_documents(arrow_path)
+                else:
+                    with open(id_map_path, 'rb') as f:
+                        self.id_mapping = pickle.load(f)
+                    with open(docs_path, 'r') as f:
+                        docs_data = json.load(f)
+                        for doc_id, doc_info in docs_data.items():
+                            self.documents[doc_id] = Document(**doc_info)
+                self._replay_journal()
+                self._snapshot_ready = True
                 logger.info(f"Loaded existing index with {len(self.documents)} documents")
+                if self.index.metric_type != faiss.METRIC_INNER_PRODUCT:
+                    logger.warning("Loaded index uses L2 distance; rebuilding for cosine similarity")
+                    self._rebuild_index()
             except Exception as e:
                 logger.error(f"Error loading index: {e}")
                 self._create_new_index()
         else:
             self._create_new_index()
+        
+        if self.use_gpu:
+            self._move_to_gpu()
+
+    def _read_index(self, index_path: str):
+        """Read a saved index, memory-mapped read-only unless it is going to GPU"""
+        index = None
+        if not self.use_gpu:
+            try:
+                index = faiss.read_index(index_path, faiss.IO_FLAG_MMAP_IFC)
+                if not index.is_trained:
+                    # Still to be trained on its first batch, which needs a writable index
+                    index = None
+            except Exception as e:
+                logger.warning(f"Cannot memory-map {index_path}, reading it into RAM: {e}")
+        self._index_mapped = index is not None
+        if index is None:
+            index = faiss.read_index(index_path)
+        self.delta_index = None
+        if self.index_type == "hnsw":
+            index.hnsw.efSearch = HNSW_EF_SEARCH
+        elif self.index_type == "ivfpq":
+            faiss.extract_index_ivf(index).nprobe = IVF_NPROBE
+        return index
+
+    def _replay_journal(self):
+        """Re-add documents saved to the journal since the last full save"""
+        records_path = os.path.join(self.index_dir, "journal.jsonl")
+        vectors_path = os.path.join(self.index_dir, "journal.f32")
+        if not os.path.exists(records_path):
+            return
+        
+        vectors = np.empty((0, self.dimension), dtype=np.float32)
+        if os.path.exists(vectors_path):
+            vectors = np.fromfile(vectors_path, dtype=np.float32)
+            vectors = vectors[:len(vectors) - len(vectors) % self.dimension].reshape(-1, self.dimension)
+        
+        start = len(self.id_mapping)
+        num_indexed = 0
+        with open(records_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning("Ignoring truncated record at the end of the journal")
+                    break
+                indexed = record.pop('indexed')
+                if indexed and num_indexed >= len(vectors):
+                    logger.warning("Journal is missing embeddings; ignoring the remaining records")
+                    break
+                doc = Document(**record)
+                self.documents[doc.id] = doc
+                if indexed:
+                    self.id_mapping[start + num_indexed] = doc.id
+                    num_indexed += 1
+                self._journaled += 1
+        
+        if num_indexed:
+            self._index_add(np.ascontiguousarray(vectors[:num_indexed]))
+        logger.info(f"Replayed {self._journaled} journaled documents")
+
+    def _append_journal(self):
+        """Append documents added since the last save to the journal"""
+        if not self._pending:
+            return
+        
+        # Embeddings first, so a crash cannot leave indexed records without them
+        if self._pending_vectors:
+            with open(os.path.join(self.index_dir, "journal.f32"), 'ab') as f:
+                f.write(np.vstack(self._pending_vectors).astype(np.float32).tobytes())
+        with open(os.path.join(self.index_dir, "journal.jsonl"), 'a', encoding='utf-8') as f:
+            for doc, indexed in self._pending:
+                f.write(json.dumps({
+                    'id': doc.id,
+                    'content': doc.content,
+                    'metadata': doc.metadata,
+                    'created_at': doc.created_at,
+                    'indexed': indexed,
+                }, ensure_ascii=False) + "\n")
+        
+        self._journaled += len(self._pending)
+        self._pending = []
+        self._pending_vectors = []
+
+    def _index_add(self, embeddings: np.ndarray):
+        """Add vectors to the index, or to the delta index if it is mapped"""
+        if self._index_mapped:
+            # Adding to a mapped index would write into the file mapping
+            if self.delta_index is None:
+                self.delta_index = faiss.IndexFlatIP(self.dimension)
+            self.delta_index.add(embeddings)
+            return
+        if not self.index.is_trained:
+            self._train_index(embeddings)
+        self.index.add(embeddings)
+
+    def _index_search(self, embeddings: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Search the index and delta index, merging the top k of both"""
+        scores, indices = self.index.search(embeddings, k)
+        if self.delta_index is None or self.delta_index.ntotal == 0:
+            return scores, indices
+        
+        delta_scores, delta_indices = self.delta_index.search(
+            embeddings, min(k, self.delta_index.ntotal)
+        )
+        delta_indices = np.where(delta_indices >= 0, delta_indices + self.index.ntotal, -1)
+        scores = np.hstack([scores, delta_scores])
+        indices = np.hstack([indices, delta_indices])
+        order = np.argsort(-scores, axis=1)[:, :k]
+        return np.take_along_axis(scores, order, 1), np.take_along_axis(indices, order, 1)
+
+    def _move_to_gpu(self):
+        """Move the index to GPU 0 if one is available"""
+        num_gpus = faiss.get_num_gpus() if hasattr(faiss, "get_num_gpus") else 0
+        if num_gpus == 0:
+            logger.warning("use_gpu set but no GPU available to FAISS; searching on CPU")
+            return
+        
+        try:
+            self._gpu_resources = faiss.StandardGpuResources()
+            self.index = faiss.index_cpu_to_gpu(self._gpu_resources, 0, self.index)
+            self._on_gpu = True
+            logger.info("Moved FAISS index to GPU 0")
+        except Exception as e:
+            logger.warning(f"Cannot move {self.index_type} index to GPU, searching on CPU: {e}")
+
+    def _load_arrow_documents(self, arrow_path: str):
+        """Memory-map saved documents; the first num_indexed rows are in index order"""
+        table = pa.ipc.open_file(pa.memory_map(arrow_path, 'r')).read_all()
+        num_indexed = int((table.schema.metadata or {}).get(b'num_indexed', b'0'))
+        self.documents = DocumentTable(table)
+        ids = table.column('id').slice(0, num_indexed).to_pylist()
+        self.id_mapping = dict(enumerate(ids))
+
+    def _save_arrow_documents(self, arrow_path: str):
+        """Write documents as one Arrow IPC file, indexed documents first"""
+        ids = [self.id_mapping[idx] for idx in range(len(self.id_mapping))]
+        indexed = set(ids)
+        ids.extend(doc_id for doc_id in self.documents if doc_id not in indexed)
+        table = pa.table({
+            'id': ids,
+            **self.documents.columns(ids),
+        }).replace_schema_metadata({'num_indexed': str(len(indexed))})
+        
+        # The loaded table may still be mapped from arrow_path; write a new
+        # file and swap it in rather than overwriting the mapped one
+        tmp_path = arrow_path + ".tmp"
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, arrow_path)
 
     def _create_new_index(self):
         """Create new FAISS index"""
         if not HAS_FAISS:
             return
         
-        self.index = faiss.IndexFlatL2(self.dimension)
-        logger.info(f"Created new FAISS index with dimension {self.dimension}")
+        # Trainable layouts (ivfpq, pq) are trained on the first batch passed
+        # to add_documents
+        if self.index_type == "ivfpq":
+            factory = IVFPQ_FACTORY
+        else:
+            factory = INDEX_FACTORIES[(self.index_type, self.quantization)]
+        
+        # Embeddings are L2-normalized, so inner product is cosine similarity
+        self._index_mapped = False
+        self.delta_index = None
+        self.index = faiss.index_factory(self.dimension, factory, faiss.METRIC_INNER_PRODUCT)
+        if self.index_type == "hnsw":
+            self.index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+            self.index.hnsw.efSearch = HNSW_EF_SEARCH
+        elif self.index_type == "ivfpq":
+            faiss.extract_index_ivf(self.index).nprobe = IVF_NPROBE
+        logger.info(f"Created new FAISS index {factory} with dimension {self.dimension}")
+
+    def _rebuild_index(self):
+        """Re-embed all stored documents into a new index"""
+        if not self.model:
+            logger.warning("Cannot rebuild index without an embedding model")
+            return
+        
+        docs = list(self.documents.values())
+        self._create_new_index()
+        self.id_mapping = {}
+        # The saved index no longer matches; the next save writes a new one
+        self._snapshot_ready = False
+        if not docs:
+            return
+        
+        embeddings = self._encode([doc.content for doc in docs])
+        if not self.index.is_trained:
+            self._train_index(embeddings)
+        self.index.add(embeddings)
+        for idx, doc in enumerate(docs):
+            doc.embedding = None
+            self.id_mapping[idx] = doc.id
+        logger.info(f"Rebuilt index with {len(docs)} documents")
+
+    def _train_index(self, embeddings: np.ndarray):
+        """Train a quantizing index on its first batch of embeddings"""
+        self._check_training_size(len(embeddings))
+        if self.index_type != "ivfpq" and self.quantization == "int8" \
+                and len(embeddings) < INT8_CALIBRATION_MIN:
+            bounds = np.vstack([
+                np.full(self.dimension, -1.0, dtype=np.float32),
+                np.full(self.dimension, 1.0, dtype=np.float32),
+            ])
+            self.index.train(bounds)
+        else:
+            self.index.train(embeddings)
+
+    def _check_training_size(self, count: int):
+        """Raise if count vectors are too few to train the untrained index"""
+        if self.index.is_trained:
+            return
+        if self.index_type != "ivfpq" and self.quantization == "int8":
+            # Small batches fall back to fixed int8 bounds
+            return
+        if count < MIN_TRAINING_VECTORS:
+            raise ValueError(
+                f"The first batch added to an untrained {self.index_type}/{self.quantization} "
+                f"index must contain at least {MIN_TRAINING_VECTORS} documents to train it, "
+                f"got {count}; add them together with add_documents"
+            )
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """Encode texts into L2-normalized float32 embeddings"""
+        embeddings = np.ascontiguousarray(
+            self.model.encode(
+                texts,
+                batch_size=ENCODE_BATCH_SIZE,
+                show_progress_bar=False,
+                convert_to_numpy=True,
+            ),
+            dtype=np.float32,
+        )
+        if HAS_FAISS:
+            faiss.normalize_L2(embeddings)
+        else:
+            embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True) + 1e-12
+        return embeddings
+
+    def _encode_queries(self, queries: List[str]) -> np.ndarray:
+        """Encode queries, reusing cached embeddings for repeated ones"""
+        keys = [query.strip() for query in queries]
+        cached = [self._query_cache.get(key) for key in keys]
+        missing = list(dict.fromkeys(key for key, emb in zip(keys, cached) if emb is None))
+        if missing:
+            encoded = dict(zip(missing, self._encode(missing)))
+            for key, embedding in encoded.items():
+                self._query_cache.set(key, embedding)
+            cached = [encoded[key] if emb is None else emb for key, emb in zip(keys, cached)]
+        return np.vstack(cached)
 
     def add_document(self, doc_id: str, content: str, metadata: Dict = None) -> bool:
         """Add document to RAG system
@@ -142,38 +614,106 @@ class RAGSystem:
             
         Returns:
             True if successful
+            
+        Raises:
+            ValueError: If the index is an untrained ivfpq or pq index, whose
+                first batch must hold at least MIN_TRAINING_VECTORS documents
         """
-        try:
-            if doc_id in self.documents:
-                logger.warning(f"Document {doc_id} already exists. Skipping.")
-                return False
+        return self.add_documents([(doc_id, content, metadata)]) == 1
+
+    def add_documents(self, items: List[Tuple[str, str, Optional[Dict]]]) -> int:
+        """Add documents with one batched encode and one index insert
+        
+        Args:
+            items: (doc_id, content, metadata) tuples
             
-            # Create document
-            doc = Document(id=doc_id, content=content, metadata=metadata)
+        Returns:
+            Number of documents added
             
-            # Generate embedding
+        Raises:
+            ValueError: If the index is an untrained ivfpq or pq index and the
+                batch holds fewer than MIN_TRAINING_VECTORS new documents
+        """
+        new_docs: List[Document] = []
+        seen = set()
+        # One timestamp for the whole batch instead of a clock read per document
+        created_at = datetime.now().isoformat()
+        for doc_id, content, metadata in items:
+            if doc_id in self.documents or doc_id in seen:
+                logger.warning(f"Document {doc_id} already exists. Skipping.")
+                continue
+            seen.add(doc_id)
+            new_docs.append(Document(id=doc_id, content=content,
+                                     metadata=metadata, created_at=created_at))
+        
+        if not new_docs:
+            return 0
+        # Checked up front so a batch too small to train the index fails loudly
+        # instead of being logged below
+        if self.model and self.index and not self._index_mapped:
+            self._check_training_size(len(new_docs))
+        
+        try:
+            # Generate embeddings in batches
             if self.model:
-                embedding = self.model.encode([content])[0].astype(np.float32)
-                doc.embedding = embedding
+                embeddings = self._encode([doc.content for doc in new_docs])
+                # With an index the vectors live only in FAISS (see get_embedding)
+                if not self.index:
+                    for doc, embedding in zip(new_docs, embeddings):
+                        doc.embedding = embedding
                 
                 # Add to FAISS index
                 if self.index:
-                    idx = len(self.id_mapping)
-                    self.index.add(np.array([embedding]))
-                    self.id_mapping[idx] = doc_id
-            
-            # Store document
-            self.documents[doc_id] = doc
-            logger.info(f"Added document: {doc_id}")
-            return True
+                    start = len(self.id_mapping)
+                    self._index_add(embeddings)
+                    for offset, doc in enumerate(new_docs):
+                        self.id_mapping[start + offset] = doc.id
+                    self._pending_vectors.append(embeddings)
             
         except Exception as e:
-            logger.error(f"Error adding document {doc_id}: {e}")
-            return False
+            logger.error(f"Error adding {len(new_docs)} documents: {e}")
+            return 0
+        
+        # Store documents
+        indexed = bool(self.model and self.index)
+        for doc in new_docs:
+            self.documents[doc.id] = doc
+            self._pending.append((doc, indexed))
+        logger.info(f"Added {len(new_docs)} documents")
+        return len(new_docs)
+
+    def get_embedding(self, doc_id: str) -> Optional[np.ndarray]:
+        """Get a document's embedding, reconstructed from the index
+        
+        Quantized indexes return an approximation of the stored vector.
+        
+        Args:
+            doc_id: Document ID
+            
+        Returns:
+            Normalized embedding, or None if the document is not indexed
+        """
+        doc = self.documents.get(doc_id)
+        if doc is not None and doc.embedding is not None:
+            return doc.embedding
+        if not self.index:
+            return None
+        
+        for idx, mapped_id in self.id_mapping.items():
+            if mapped_id == doc_id:
+                if idx >= self.index.ntotal:
+                    return self.delta_index.reconstruct(idx - self.index.ntotal)
+                if self.index_type == "ivfpq":
+                    faiss.extract_index_ivf(self.index).make_direct_map()
+                return self.index.reconstruct(idx)
+        return None
 
     def search(self, query: str, k: int = 5) -> List[Tuple[str, float, Document]]:
         """Search for relevant documents
         
+        To serve many concurrent queries, collect them and call
+        search_batch rather than calling this from one thread per query.
+        
         Args:
             query: Search query
             k: Number of results
@@ -181,26 +721,49 @@ class RAGSystem:
         Returns:
             List of (doc_id, score, document) tuples
         """
+        results = self.search_batch([query], k)
+        if not results:
+            return []
+        
+        logger.info(f"Search for '{query}' returned {len(results[0])} results")
+        return results[0]
+
+    def search_batch(self, queries: List[str], k: int = 5) -> List[List[Tuple[str, float, Document]]]:
+        """Search for several queries with one encode and one index search
+        
+        FAISS spreads a batch over FAISS_NUM_THREADS OpenMP threads, which
+        scales better than Python threads each searching one query.
+        
+        Args:
+            queries: Search queries
+            k: Number of results per query
+            
+        Returns:
+            One list of (doc_id, score, document) tuples per query
+        """
         if not self.model or not self.index:
             logger.warning("Search not available. Model or index not initialized.")
             return []
+        if not queries or k <= 0:
+            return []
         
         try:
-            # Encode query
-            query_embedding = self.model.encode([query])[0].astype(np.float32)
+            # Encode queries
+            query_embeddings = self._encode_queries(queries)
             
-            # Search
-            distances, indices = self.index.search(np.array([query_embedding]), min(k, len(self.documents)))
+            # Search; FAISS pads rows with -1 when fewer than k vectors match
+            scores, indices = self._index_search(query_embeddings, k)
             
             results = []
-            for dist, idx in zip(distances[0], indices[0]):
-                if idx >= 0 and idx in self.id_mapping:
-                    doc_id = self.id_mapping[idx]
-                    doc = self.documents[doc_id]
-                    score = float(1 / (1 + dist))  # Convert distance to similarity
-                    results.append((doc_id, score, doc))
-            
-            logger.info(f"Search for '{query}' returned {len(results)} results")
+            for row_scores, row_indices in zip(scores, indices):
+                row = []
+                for score, idx in zip(row_scores, row_indices):
+                    if idx >= 0 and idx in self.id_mapping:
+                        doc_id = self.id_mapping[idx]
+                        doc = self.documents[doc_id]
+                        # Cosine similarity in [-1, 1]
+                        row.append((doc_id, float(score), doc))
+                results.append(row)
             return results
             
         except Exception as e:
@@ -208,17 +771,55 @@ class RAGSystem:
             return []
 
     def save(self):
-        """Save index and documents to disk"""
+        """Save index and documents to disk
+        
+        After the first full save only documents added since the previous
+        save are written, appended to the journal; the full index is
+        rewritten once COMPACT_THRESHOLD documents are journaled.
+        """
         if not HAS_FAISS or not self.index:
             return
         
         try:
-            os.makedirs(self.index_dir, exist_ok=True)
-            
-            # Save FAISS index
-            index_path = os.path.join(self.index_dir, "faiss.index")
-            faiss.write_index(self.index, index_path)
-            
+            if self._snapshot_ready and self._journaled + len(self._pending) < COMPACT_THRESHOLD:
+                self._append_journal()
+                logger.info(f"Saved RAG index to {self.index_dir} ({self._journaled} journaled)")
+            else:
+                self.compact()
+        except Exception as e:
+            logger.error(f"Error saving index: {e}")
+
+    def compact(self):
+        """Write the full index and documents, folding in the delta index and journal"""
+        if not HAS_FAISS or not self.index:
+            return
+        
+        os.makedirs(self.index_dir, exist_ok=True)
+        index_path = os.path.join(self.index_dir, "faiss.index")
+        
+        # Save FAISS index
+        if self._on_gpu:
+            index = faiss.index_gpu_to_cpu(self.index)
+        elif self._index_mapped:
+            # The mapped index is read-only; merge into a copy in RAM
+            index = faiss.read_index(index_path)
+            if self.delta_index is not None and self.delta_index.ntotal:
+                index.add(self.delta_index.reconstruct_n(0, self.delta_index.ntotal))
+        else:
+            index = self.index
+        # The current file may be mapped; write a new one and swap it in
+        faiss.write_index(index, index_path + ".tmp")
+        os.replace(index_path + ".tmp", index_path)
+        
+        # Save index type so it is restored on load
+        meta_path = os.path.join(self.index_dir, "index_meta.json")
+        with open(meta_path, 'w') as f:
+            json.dump({'index_type': self.index_type, 'quantization': self.quantization}, f)
+        
+        # Save documents; the row order doubles as the ID mapping
+        if HAS_PYARROW:
+            self._save_arrow_documents(os.path.join(self.index_dir, "docs.arrow"))
+        else:
             # Save ID mapping
             id_map_path = os.path.join(self.index_dir, "id_mapping.pkl")
             with open(id_map_path, 'wb') as f:
@@ -237,19 +838,33 @@ class RAGSystem:
             
             with open(docs_path, 'w') as f:
                 json.dump(docs_data, f, ensure_ascii=False, indent=2)
-            
-            logger.info(f"Saved RAG index to {self.index_dir}")
-            
-        except Exception as e:
-            logger.error(f"Error saving index: {e}")
+        
+        for name in ("journal.jsonl", "journal.f32"):
+            path = os.path.join(self.index_dir, name)
+            if os.path.exists(path):
+                os.remove(path)
+        self._pending = []
+        self._pending_vectors = []
+        self._journaled = 0
+        self._snapshot_ready = True
+        
+        # Map the new file so the index is no longer held in RAM
+        if not self._on_gpu:
+            self.index = self._read_index(index_path)
+        
+        logger.info(f"Saved RAG index to {self.index_dir}")
 
     def get_stats(self) -> Dict:
         """Get RAG system statistics"""
         return {
             'total_documents': len(self.documents),
             'index_size': len(self.id_mapping),
+            'delta_size': self.delta_index.ntotal if self.delta_index is not None else 0,
             'model': self.model_name,
             'dimension': self.dimension,
+            'index_type': self.index_type,
+            'quantization': self.quantization,
+            'backend': self.backend,
             'has_faiss': HAS_FAISS and self.index is not None,
             'has_embeddings': self.model is not None
         }
@@ -22,33 +22,58 @@ class Document:
 
 
 class VectorStore:
-    """In-memory vector store for document embeddings."""
+    """In-memory vector store for document embeddings.
+    
+    Embeddings are also kept L2-normalized as rows of one float32 matrix
+    (grown by doubling), so a search is a single BLAS matrix-vector
+    product with no per-row rescaling.
+    """
     
     def __init__(self):
         self.documents: Dict[str, Document] = {}
         self.embeddings: Dict[str, np.ndarray] = {}
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._matrix: Optional[np.ndarray] = None
     
     def add_document(self, document: Document) -> None:
         """Add a document to the store."""
         self.documents[document.id] = document
         if document.embedding is not None:
             self.embeddings[document.id] = document.embedding
+            self._store_row(document.id, document.embedding)
+    
+    def _store_row(self, doc_id: str, embedding: np.ndarray) -> None:
+        """Write an embedding into the search matrix."""
+        embedding = np.asarray(embedding, dtype=np.float32).ravel()
+        row = self._rows.get(doc_id)
+        if row is None:
+            row = len(self._ids)
+            if self._matrix is None:
+                self._matrix = np.empty((16, embedding.shape[0]), dtype=np.float32)
+            elif row == self._matrix.shape[0]:
+                self._matrix = np.resize(self._matrix, (row * 2, self._matrix.shape[1]))
+            self._ids.append(doc_id)
+            self._rows[doc_id] = row
+        self._matrix[row] = embedding / (np.linalg.norm(embedding) + 1e-9)
     
     def similarity_search(self, query_embedding: np.ndarray, 
                          top_k: int = 5) -> List[Tuple[Document, float]]:
         """Find most similar documents to query embedding."""
-        if not self.embeddings:
+        n = len(self._ids)
+        if not n or top_k <= 0:
             return []
         
-        similarities = []
-        for doc_id, embedding in self.embeddings.items():
-            similarity = np.dot(query_embedding, embedding) / (
-                np.linalg.norm(query_embedding) * np.linalg.norm(embedding) + 1e-9
-            )
-            similarities.append((self.documents[doc_id], similarity))
+        query = np.asarray(query_embedding, dtype=np.float32).ravel()
+        query = query / (np.linalg.norm(query) + 1e-9)
+        similarities = self._matrix[:n] @ query
         
-        similarities.sort(key=lambda x: x[1], reverse=True)
-        return similarities[:top_k]
+        if top_k < n:
+            top = np.argpartition(-similarities, top_k)[:top_k]
+        else:
+            top = np.arange(n)
+        top = top[np.argsort(-similarities[top])]
+        return [(self.documents[self._ids[i]], float(similarities[i])) for i in top]
 
 
 class RAGRetriever:
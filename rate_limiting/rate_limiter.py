@@ -7,7 +7,8 @@ algorithms.
 
 import time
 import logging
-from collections import defaultdict, deque
+from array import array
+from collections import defaultdict
 from threading import Lock
 from typing import Dict, Optional, Tuple
 from datetime import datetime, timedelta
@@ -61,7 +62,10 @@ class TokenBucketRateLimiter:
 class SlidingWindowRateLimiter:
     """Sliding window-based rate limiter.
     
-    Tracks requests in a moving time window for precise rate limiting.
+    Keeps the timestamps of the last max_requests allowed requests in a
+    ring of doubles. A request is allowed while the ring has room or its
+    oldest timestamp has left the window, so each check is O(1) and
+    memory is fixed at 8 bytes per allowed request.
     """
     
     def __init__(self, max_requests: int, window_seconds: int):
@@ -73,46 +77,108 @@ class SlidingWindowRateLimiter:
         """
         self.max_requests = max_requests
         self.window_seconds = window_seconds
-        self.requests = deque()
+        self.times = array('d', [0.0]) * max(max_requests, 1)
+        self.head = 0  # Oldest timestamp once the ring is full
+        self.count = 0
         self.lock = Lock()
     
+    @property
+    def requests_in_window(self) -> int:
+        """Number of allowed requests still inside the window."""
+        with self.lock:
+            window_start = time.monotonic() - self.window_seconds
+            size = len(self.times)
+            return sum(
+                1 for i in range(self.count)
+                if self.times[(self.head + i) % size] >= window_start
+            )
+    
     def allow_request(self) -> bool:
         """Check if a request is allowed under the rate limit.
         
         Returns:
             True if request is allowed, False otherwise
         """
+        now = time.monotonic()
         with self.lock:
-            now = time.time()
-            window_start = now - self.window_seconds
-            
-            # Remove requests outside the window
-            while self.requests and self.requests[0] < window_start:
-                self.requests.popleft()
-            
-            if len(self.requests) < self.max_requests:
-                self.requests.append(now)
+            if self.count < self.max_requests:
+                self.times[(self.head + self.count) % len(self.times)] = now
+                self.count += 1
+                return True
+            # Full ring: the oldest request makes room once it leaves the window
+            if self.count and self.times[self.head] < now - self.window_seconds:
+                self.times[self.head] = now
+                self.head = (self.head + 1) % len(self.times)
                 return True
             return False
 
 
+# Lock shards in a PerClientRateLimiter; clients map onto shards by hash,
+# so concurrent requests from different clients rarely share a lock
+N_SHARDS = 32
+
+# Clients with no requests for this long are dropped from the table
+IDLE_CLIENT_SECONDS = 3600
+
+
+class _LimiterShard:
+    """Per-client limiters for the clients that hash to one shard"""
+    
+    __slots__ = ('lock', 'limiters', 'last_seen', 'next_sweep')
+    
+    def __init__(self):
+        self.lock = Lock()
+        self.limiters: Dict[str, object] = {}
+        self.last_seen: Dict[str, float] = {}
+        self.next_sweep = time.monotonic() + IDLE_CLIENT_SECONDS
+
+
 class PerClientRateLimiter:
-    """Per-client rate limiting with configurable strategies."""
+    """Per-client rate limiting with configurable strategies.
+    
+    Limiters are split across shards picked by client ID hash. A shard
+    lock is held only to look up the client's limiter; the limiter's own
+    lock guards the rate check. Idle clients are swept from each shard
+    about once every IDLE_CLIENT_SECONDS.
+    """
     
     def __init__(self, strategy: str = 'token_bucket',
-                 rate: int = 100, capacity: int = 200):
+                 rate: int = 100, capacity: int = 200,
+                 num_shards: int = N_SHARDS,
+                 idle_seconds: float = IDLE_CLIENT_SECONDS):
         """Initialize per-client rate limiter.
         
         Args:
             strategy: 'token_bucket' or 'sliding_window'
             rate: Rate parameter (tokens/sec or requests for window)
             capacity: Capacity parameter (bucket size or window duration)
+            num_shards: Number of independently locked shards
+            idle_seconds: Idle time after which a client's limiter is dropped
         """
         self.strategy = strategy
         self.rate = rate
         self.capacity = capacity
-        self.limiters: Dict[str, object] = {}
-        self.lock = Lock()
+        self.idle_seconds = idle_seconds
+        self._shards = [_LimiterShard() for _ in range(num_shards)]
+    
+    def _shard(self, client_id: str) -> _LimiterShard:
+        return self._shards[hash(client_id) % len(self._shards)]
+    
+    def _create_limiter(self):
+        if self.strategy == 'token_bucket':
+            return TokenBucketRateLimiter(self.rate, self.capacity)
+        # sliding_window
+        return SlidingWindowRateLimiter(self.rate, self.capacity)
+    
+    def _sweep_shard(self, shard: _LimiterShard, now: float) -> int:
+        """Drop idle clients from a shard; caller holds shard.lock."""
+        cutoff = now - self.idle_seconds
+        idle = [cid for cid, seen in shard.last_seen.items() if seen < cutoff]
+        for client_id in idle:
+            del shard.limiters[client_id]
+            del shard.last_seen[client_id]
+        shard.next_sweep = now + self.idle_seconds
+        return len(idle)
     
     def allow_request(self, client_id: str) -> bool:
         """Check if a client's request is allowed.
@@ -123,19 +189,32 @@ class PerClientRateLimiter:
         Returns:
             True if request is allowed, False otherwise
         """
-        with self.lock:
-            if client_id not in self.limiters:
-                if self.strategy == 'token_bucket':
-                    self.limiters[client_id] = TokenBucketRateLimiter(
-                        self.rate, self.capacity
-                    )
-                else:  # sliding_window
-                    self.limiters[client_id] = SlidingWindowRateLimiter(
-                        self.rate, self.capacity
-                    )
-            
-            limiter = self.limiters[client_id]
-            return limiter.allow_request()
+        now = time.monotonic()
+        shard = self._shard(client_id)
+        with shard.lock:
+            limiter = shard.limiters.get(client_id)
+            if limiter is None:
+                limiter = shard.limiters[client_id] = self._create_limiter()
+            shard.last_seen[client_id] = now
+            if now >= shard.next_sweep:
+                self._sweep_shard(shard, now)
+        
+        return limiter.allow_request()
+    
+    def sweep_idle(self) -> int:
+        """Drop limiters for clients idle longer than idle_seconds.
+        
+        Returns:
+            Number of clients removed
+        """
+        now = time.monotonic()
+        removed = 0
+        for shard in self._shards:
+            with shard.lock:
+                removed += self._sweep_shard(shard, now)
+        if removed:
+            logger.debug(f"Dropped {removed} idle rate limit clients")
+        return removed
     
     def get_limiter_stats(self, client_id: str) -> Dict:
         """Get rate limiter statistics for a client.
@@ -146,25 +225,26 @@ class PerClientRateLimiter:
         Returns:
             Dictionary with limiter statistics
         """
-        with self.lock:
-            if client_id not in self.limiters:
-                return {'status': 'no_data'}
-            
-            limiter = self.limiters[client_id]
-            if isinstance(limiter, TokenBucketRateLimiter):
-                return {
-                    'strategy': 'token_bucket',
-                    'tokens': limiter.tokens,
-                    'capacity': limiter.capacity,
-                    'rate': limiter.rate
-                }
-            else:
-                return {
-                    'strategy': 'sliding_window',
-                    'requests_in_window': len(limiter.requests),
-                    'max_requests': limiter.max_requests,
-                    'window_seconds': limiter.window_seconds
-                }
+        shard = self._shard(client_id)
+        with shard.lock:
+            limiter = shard.limiters.get(client_id)
+        if limiter is None:
+            return {'status': 'no_data'}
+        
+        if isinstance(limiter, TokenBucketRateLimiter):
+            return {
+                'strategy': 'token_bucket',
+                'tokens': limiter.tokens,
+                'capacity': limiter.capacity,
+                'rate': limiter.rate
+            }
+        else:
+            return {
+                'strategy': 'sliding_window',
+                'requests_in_window': limiter.requests_in_window,
+                'max_requests': limiter.max_requests,
+                'window_seconds': limiter.window_seconds
+            }
 
 
 class AdaptiveRateLimiter:
@@ -0,0 +1,9 @@
+"""Test settings applied before any test module imports the app."""
+
+import os
+
+# Read when api is imported: one background generation worker is enough
+# for tests, and a blank API key keeps a developer's .env from sending
+# test requests to Perplexity
+os.environ.setdefault('GENERATION_WORKERS', '1')
+os.environ['PERPLEXITY_API_KEY'] = ''
@@ -0,0 +1,48 @@
+# Unit tests for the posting scheduler
+from pathlib import Path
+
+import pytest
+from automation import load_config, schedule_times
+
+CONFIG_PATH = str(Path(__file__).resolve().parent.parent / 'config.yml')
+
+MONDAY, WEDNESDAY, THURSDAY, FRIDAY, SUNDAY = 0, 2, 3, 4, 6
+
+
+@pytest.fixture(scope='module')
+def schedules():
+    platforms = load_config(CONFIG_PATH)['platforms']
+    return {
+        platform: schedule_times(platform_config['posting_schedule'])
+        for platform, platform_config in platforms.items()
+    }
+
+
+# Named weekdays post only on those days
+def test_weekday_schedule(schedules):
+    instagram = schedules['instagram']
+    assert instagram[MONDAY] == {'09:00', '15:00'}
+    assert instagram[WEDNESDAY] == {'10:00', '16:00'}
+    assert instagram[FRIDAY] == {'11:00', '17:00'}
+    assert '09:00' not in instagram[WEDNESDAY]
+    assert all(not instagram[day] for day in (1, 3, 5, 6))
+
+# 'daily' covers every day of the week
+def test_daily_schedule(schedules):
+    assert all(times == {'18:00', '20:00'} for times in schedules['tiktok'].values())
+
+# 'weekly' takes its day from the value
+def test_weekly_schedule(schedules):
+    youtube = schedules['youtube']
+    assert youtube[SUNDAY] == {'19:00'}
+    assert all(not youtube[day] for day in range(SUNDAY))
+
+def test_facebook_schedule(schedules):
+    facebook = schedules['facebook']
+    assert facebook[MONDAY] == {'14:00'}
+    assert facebook[THURSDAY] == {'19:00'}
+    assert sum(len(times) for times in facebook.values()) == 2
+
+# Single-digit hours are zero-padded to match strftime('%H:%M')
+def test_pads_single_digit_hours():
+    assert schedule_times({'monday': ['9:30']})[MONDAY] == {'09:30'}
@@ -0,0 +1,42 @@
+# Unit tests for JWT signing and verification
+import uuid
+
+import jwt
+import pytest
+from auth.jwt_utils import ALGORITHM, SECRET_KEY, JWTUtils, _decode_token
+
+
+@pytest.fixture(scope='module')
+def token():
+    return JWTUtils.create_access_token(
+        user_id=uuid.uuid4(), email='user@example.com', username='user'
+    )
+
+
+def pyjwt_decode(token):
+    return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+
+
+# Issued tokens verify on the fast path and in PyJWT alike
+def test_valid_token_agrees_with_pyjwt(token):
+    assert _decode_token(token) == pyjwt_decode(token)
+    assert JWTUtils.verify_token_raw(token)['username'] == 'user'
+
+# The signature must bind the exact token string: bytes outside the
+# base64url alphabet and extra segments are rejected, as PyJWT does
+@pytest.mark.parametrize('tamper', [
+    lambda t: t + '!!',
+    lambda t: t + '.',
+    lambda t: t + '.x',
+    lambda t: t[:-1] + '*' + t[-1],
+    lambda t: t.replace('.', '.!', 1),
+    lambda t: t.rsplit('.', 1)[0],
+], ids=['trailing_junk', 'empty_fourth_segment', 'fourth_segment',
+        'junk_in_signature', 'junk_in_payload', 'missing_signature'])
+def test_tampered_token_rejected_like_pyjwt(token, tamper):
+    tampered = tamper(token)
+    with pytest.raises(jwt.InvalidTokenError):
+        pyjwt_decode(tampered)
+    with pytest.raises(jwt.InvalidTokenError):
+        _decode_token(tampered)
+    assert JWTUtils.verify_token_raw(tampered) is None
@@ -0,0 +1,66 @@
+"""Shared fixtures for the integration tests."""
+
+from unittest.mock import AsyncMock
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from api import app
+
+
+@pytest.fixture(scope="session")
+def client():
+    """One test client per session (per xdist worker); startup runs once."""
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def mock_generate(client, monkeypatch):
+    """Answer Perplexity calls with a canned completion for one test.
+
+    The route handler is bound at import, so the shared HTTP client's post
+    is replaced instead; the AsyncMock returned records each call.
+    """
+    completion = {
+        'model': 'pplx-70b-chat',
+        'choices': [{'message': {'content': 'Generated content'}}],
+    }
+    mock = AsyncMock(return_value=httpx.Response(200, json=completion))
+    monkeypatch.setattr(client.app.state.http, 'post', mock)
+    monkeypatch.setattr('api.PERPLEXITY_API_KEY', 'test_key')
+    yield mock
+
+
+@pytest.fixture
+def post_generate(client):
+    """POST a JSON body to /generate, sending an Authorization header if auth is set."""
+    def _post(body=None, auth=None):
+        headers = {'Authorization': auth} if auth else {}
+        return client.post('/generate', headers=headers, json=body or {})
+    return _post
+
+
+class FakeClock:
+    """Stand-in for the time module whose clock only moves when told to."""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def fake_time(monkeypatch):
+    """Freeze the clock seen by the rate limiters; advance it explicitly."""
+    clock = FakeClock()
+    monkeypatch.setattr('rate_limiting.rate_limiter.time', clock)
+    return clock